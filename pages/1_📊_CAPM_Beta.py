@@ -1,12 +1,12 @@
 # ---------------------- IMPORTS ----------------------
 import streamlit as st
 import datetime
-import pandas_datareader.data as web
-import yfinance as yf
-import pandas as pd
-from pages.utils import capm_functions
+from pages.utils import capm_functions, alignment, frame_layout, price_store
+from pages.utils.data_providers import get_provider
+from pages.utils.lazy_import import lazy_import
 import numpy as np
-import plotly.express as px
+
+px = lazy_import('plotly.express')
 
 # ---------------------- PAGE CONFIG ----------------------
 st.set_page_config(
@@ -45,33 +45,29 @@ try:
     end = datetime.date.today()
     start = datetime.date(end.year - year, end.month, end.day)
 
-    # S&P500 data
-    SP500 = web.DataReader(['sp500'], 'fred', start, end)
+    # S&P500 and risk-free rate (local cache, refreshed at most a few times a day)
+    SP500 = price_store.load_market(years=year)
+    RF = price_store.load_risk_free(years=10)
 
     # Stock data
-    stocks_df = yf.download(stock, period=f'{year}y')[['Close']]
-    stocks_df.columns = [stock]
-    stocks_df.reset_index(inplace=True)
-
-    SP500.reset_index(inplace=True)
-    SP500.columns = ['Date', 'sp500']
+    stocks_df = get_provider().get_prices([stock], start)
 
-    # Merge on Date
-    stocks_df['Date'] = pd.to_datetime(stocks_df['Date'].dt.strftime('%Y-%m-%d'))
-    stocks_df = pd.merge(stocks_df, SP500, on='Date', how='inner')
+    # Align on common trading days
+    stocks_df = frame_layout.compact_prices(alignment.align_with_market(stocks_df, SP500, how='drop'))
 
     # ---------------------- CALCULATIONS ----------------------
     stocks_daily_return = capm_functions.daily_return(stocks_df)
     rm = stocks_daily_return['sp500'].mean() * 252  # Annual market return
-    beta, alpha = capm_functions.calculate_beta(stocks_daily_return, stock)
-    rf = 0  # Risk-free rate
-    return_value = round(rf + (beta * (rm - rf)), 2)
+    rf_daily = capm_functions.daily_risk_free(RF, stocks_daily_return['Date'])  # Risk-free rate
+    beta, alpha = capm_functions.calculate_beta(stocks_daily_return, stock, rf=rf_daily)
+    return_value = round(capm_functions.expected_return(beta, stocks_daily_return, rf_daily), 2)
 
     # ---------------------- RESULTS ----------------------
     st.markdown("### 📌 Results")
-    res_col1, res_col2 = st.columns(2)
+    res_col1, res_col2, res_col3 = st.columns(3)
     res_col1.metric(label="Beta", value=f"{beta:.2f}")
     res_col2.metric(label="Expected Return (%)", value=f"{return_value:.2f}%")
+    res_col3.metric(label="Risk-free Rate (%)", value=f"{rf_daily[-1] * 252:.2f}%")
 
     # ---------------------- PLOT ----------------------
     fig = px.scatter(
@@ -84,7 +80,7 @@ try:
     )
     fig.add_scatter(
         x=stocks_daily_return['sp500'],
-        y=beta * stocks_daily_return['sp500'] + alpha,
+        y=beta * stocks_daily_return['sp500'] + alpha + (1 - beta) * rf_daily.mean(),
         mode='lines',
         name='Expected Return',
         line=dict(color="crimson", width=2)
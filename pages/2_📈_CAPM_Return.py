@@ -1,11 +1,12 @@
 # ---------------------- IMPORTS ----------------------
 import streamlit as st
-import pandas_datareader.data as web
 import datetime
 import pandas as pd
-import yfinance as yf
-from pages.utils import capm_functions
-import plotly.express as px
+from pages.utils import capm_functions, alignment, frame_layout, price_store, table_view
+from pages.utils.data_providers import get_provider
+
+# Points drawn per line on the price charts (long histories are downsampled)
+MAX_CHART_POINTS = 1000
 
 # ---------------------- PAGE CONFIG ----------------------
 st.set_page_config(
@@ -43,65 +44,58 @@ try:
     end = datetime.date.today()
     start = datetime.date(end.year - year, end.month, end.day)
 
-    # Market Data (S&P 500)
-    SP500 = web.DataReader(['sp500'], 'fred', start, end)
-    SP500.reset_index(inplace=True)
-    SP500.columns = ['Date', 'sp500']
+    # Market Data (S&P 500) and risk-free rate (local cache, refreshed at most a few times a day)
+    SP500 = price_store.load_market(years=year)
+    RF = price_store.load_risk_free(years=10)
 
-    # Stock Price Data
-    stocks_df = pd.DataFrame()
-    for stock in stocks_list:
-        data = yf.download(stock, period=f'{year}y')
-        stocks_df[stock] = data['Close']
-    stocks_df.reset_index(inplace=True)
+    # Stock Price Data (one batched request for all tickers)
+    stocks_df = get_provider().get_prices(stocks_list, start)
 
-    # Merge with Market Data
-    stocks_df['Date'] = pd.to_datetime(stocks_df['Date'].dt.strftime('%Y-%m-%d'))
-    stocks_df = pd.merge(stocks_df, SP500, on='Date', how='inner')
+    # Align with Market Data on common trading days
+    stocks_df = frame_layout.compact_prices(alignment.align_with_market(stocks_df, SP500, how='drop'))
 
     # ---------------------- DISPLAY RAW DATA ----------------------
     col1, col2 = st.columns(2)
     with col1:
         st.markdown('### 📄 Stock Prices(Head)')
-        st.dataframe(stocks_df.head(), use_container_width=True)
+        table_view.table(stocks_df.head())
     with col2:
         st.markdown('### 📄 Stock Prices(Tail)')
-        st.dataframe(stocks_df.tail(), use_container_width=True)
+        table_view.table(stocks_df.tail())
+    with st.expander("📜 Full Price History"):
+        table_view.paginated_table(stocks_df, key="price_table", page_size=50, sort_by='Date', ascending=False)
 
     # ---------------------- PRICE CHARTS ----------------------
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("### Price of all the Stocks")
         st.caption("initial stock prices")
-        st.plotly_chart(capm_functions.interactive_plot(stocks_df), use_container_width=True)
+        st.plotly_chart(capm_functions.interactive_plot(stocks_df, max_points=MAX_CHART_POINTS), use_container_width=True)
     with col2:
         st.markdown("### Price of all the Stocks (After Normalizing)")
-        st.caption("prices being normalized over initial stock prices")
-        st.plotly_chart(capm_functions.interactive_plot(capm_functions.normalize(stocks_df)), use_container_width=True)
+        base_date = st.date_input("📅 Normalize from", start, min_value=start, max_value=end)
+        st.caption("prices being normalized over the stock prices on the chosen date")
+        normalized_df = capm_functions.normalize(stocks_df, base_date=base_date)
+        st.plotly_chart(capm_functions.interactive_plot(normalized_df, max_points=MAX_CHART_POINTS), use_container_width=True)
 
     # ---------------------- DAILY RETURNS ----------------------
     stocks_daily_return = capm_functions.daily_return(stocks_df)
 
     # ---------------------- CALCULATE BETA ----------------------
-    beta = {}
-    alpha = {}
-    for i in stocks_daily_return.columns:
-        if i not in ['Date', 'sp500']:
-            b, a = capm_functions.calculate_beta(stocks_daily_return, i)
-            beta[i] = b
-            alpha[i] = a
+    rf_daily = capm_functions.daily_risk_free(RF, stocks_daily_return['Date'])
+    betas, alphas = capm_functions.calculate_betas(stocks_daily_return, rf=rf_daily)
+    beta = betas.to_dict()
 
     beta_df = pd.DataFrame({
-        'Stock': list(beta.keys()),
-        'Beta Value': [round(v, 2) for v in beta.values()]
+        'Stock': betas.index,
+        'Beta Value': betas.to_numpy()
     })
 
     # ---------------------- CALCULATE RETURNS ----------------------
-    rf = 0
     rm = stocks_daily_return['sp500'].mean() * 252
     return_df = pd.DataFrame({
-        'Stock': list(beta.keys()),
-        'Expected Return (%)': [round(rf + (b * (rm - rf)), 2) for b in beta.values()]
+        'Stock': betas.index,
+        'Expected Return (%)': capm_functions.expected_return(betas, stocks_daily_return, rf_daily).to_numpy()
     })
 
     # ---------------------- DISPLAY RESULTS ----------------------
@@ -109,11 +103,11 @@ try:
     with col1:
         st.markdown('### Calculated Risk (β)')
         st.caption("risk of market is considered as 1")
-        st.dataframe(beta_df, use_container_width=True)
+        table_view.table(beta_df)
     with col2:
         st.markdown('### Calculated Return using CAPM')
-        st.caption("the risk-free rate + the beta of the investment * the expected return on the market - the risk free rate")
-        st.dataframe(return_df, use_container_width=True)
+        st.caption(f"the risk-free rate ({rf_daily[-1] * 252:.2f}%, 3-month T-bill) + the beta of the investment * the expected return on the market - the risk free rate")
+        table_view.table(return_df)
 
     # ---------------------- INSIGHTS ----------------------
     st.markdown("### 📊 Insights & Analysis")
@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
-import yfinance as yf
 import datetime
+from pages.utils.data_providers import get_provider, period_start
+from pages.utils.frame_layout import compact_ohlcv
+from pages.utils import intraday
 from pages.utils.plotly_figure import plotly_table, close_chart, candlestick, RSI, Moving_average, MACD
 
 # Page config
@@ -69,8 +71,8 @@ with col3:
     end_date = st.date_input("End Date", datetime.date.today())
 
 # --- Company Info ---
-stock = yf.Ticker(ticker)
-info = stock.info
+provider = get_provider()
+info = provider.get_info(ticker)
 
 st.subheader(f"📄 {ticker} — {info.get('longName', 'N/A')}")
 st.write(info.get('longBusinessSummary', 'No summary available.'))
@@ -109,7 +111,7 @@ with col2:
     st.table(df2)
 
 # --- Price Data ---
-data = yf.download(ticker, start=start_date, end=end_date)
+data = provider.get_ohlcv(ticker, start=start_date, end=end_date)
 
 if len(data) < 1:
     st.error("Invalid ticker or no data available.")
@@ -155,9 +157,16 @@ with col3:
     else:
         indicator = st.selectbox("Indicator", ("RSI", "Moving Average", "MACD"))
 
-# Get data
+# Get data (short periods are drawn from stored intraday bars)
 period = period_options[selected_period]
-ticker_data = stock.history(period=period)
+ticker_data = None
+if period in intraday.INTRADAY_PERIODS:
+    try:
+        ticker_data = intraday.load_bars(ticker, intraday.INTRADAY_PERIODS[period])
+    except Exception:
+        ticker_data = None
+if ticker_data is None:
+    ticker_data = compact_ohlcv(provider.get_ohlcv(ticker, start=period_start(period)))
 
 # Chart logic
 if chart_type == "Candle" and indicator == "RSI":
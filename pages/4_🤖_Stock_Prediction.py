@@ -1,8 +1,10 @@
 import streamlit as st
+import time
 from pages.utils.model_train import (
-    get_data, get_rolling_mean, get_differencing_order,
-    scaling, evaluate_model, get_forecast, inverse_scaling
+    get_data, get_rolling_mean, scaling, forecast_frame, inverse_scaling
 )
+from pages.utils.baselines import best_baseline
+from pages.utils import forecast_jobs
 import pandas as pd
 from pages.utils.plotly_figure import plotly_table, Moving_average_forecast
 
@@ -34,29 +36,74 @@ with col3:
 # -------------------- MODEL EXECUTION --------------------
 st.subheader(f'📌 Predicting Next 30 Days Close Price for: **{ticker}**')
 
-close_price = get_data(ticker)
-rolling_price = get_rolling_mean(close_price)
-
-differencing_order = get_differencing_order(rolling_price)
-scaled_data, scaler = scaling(rolling_price)
-rmse = evaluate_model(scaled_data, differencing_order)
-
-# -------------------- METRIC DISPLAY --------------------
-st.metric("Model RMSE Score", f"{rmse:.4f}", help="Lower RMSE indicates better model accuracy.")
-
-forecast = get_forecast(scaled_data, differencing_order)
-forecast['Close'] = inverse_scaling(scaler, forecast['Close'])
-
-# -------------------- FORECAST DATA TABLE --------------------
-st.markdown("### 📜 Forecast Data (Next 30 Days)")
-fig_tail = plotly_table(forecast.sort_index(ascending=True).round(3))
-fig_tail.update_layout(height=300)
-st.plotly_chart(fig_tail, use_container_width=True)
-
-# -------------------- PLOT FORECAST --------------------
-forecast_full = pd.concat([rolling_price, forecast])
-st.markdown("### 📈 Moving Average Forecast Trend")
-st.plotly_chart(Moving_average_forecast(forecast_full.iloc[150:]), use_container_width=True)
+# Reruns that only poll the background job reuse the prices and the baseline of the first run
+polling = st.session_state.pop('prediction_poll', None) == ticker
+if not polling or st.session_state.get('prediction', {}).get('ticker') != ticker:
+    close_price = get_data(ticker)
+    rolling_price = get_rolling_mean(close_price)
+    scaled_data, scaler = scaling(rolling_price)
+    st.session_state['prediction'] = {'ticker': ticker, 'close_price': close_price, 'rolling_price': rolling_price,
+                                      'scaled_data': scaled_data, 'scaler': scaler}
+prediction = st.session_state['prediction']
+close_price, rolling_price = prediction['close_price'], prediction['rolling_price']
+
+# Renders the RMSE, forecast table and trend chart of one model into `container`
+def show_forecast(container, forecast, rmse, model_name):
+    with container.container():
+        # -------------------- METRIC DISPLAY --------------------
+        st.metric(f"Model RMSE Score ({model_name})", f"{rmse:.4f}", help="Lower RMSE indicates better model accuracy.")
+
+        # -------------------- FORECAST DATA TABLE --------------------
+        st.markdown("### 📜 Forecast Data (Next 30 Days)")
+        fig_tail = plotly_table(forecast.sort_index(ascending=True))
+        fig_tail.update_layout(height=300)
+        st.plotly_chart(fig_tail, use_container_width=True)
+
+        # -------------------- PLOT FORECAST --------------------
+        forecast_full = pd.concat([rolling_price, forecast])
+        st.markdown("### 📈 Moving Average Forecast Trend")
+        st.plotly_chart(Moving_average_forecast(forecast_full.iloc[150:]), use_container_width=True)
+
+# -------------------- FAST BASELINE --------------------
+# The ARIMA fit runs as a background job; until it has finished the best cheap baseline is shown
+status = st.empty()
+results = st.empty()
+key = forecast_jobs.submit(ticker, close_price)
+job = forecast_jobs.status(key)
+
+if job['state'] == 'done':
+    # -------------------- ARIMA --------------------
+    # Fits that exceed their time budget fall back to a smaller ARIMA, then to cheaper models
+    arima = forecast_jobs.result(key)
+    rmse, model_name = arima['rmse'], arima['model']
+    show_forecast(results, arima['forecast'], rmse, model_name)
+    skipped = [a for a in arima['metadata']['attempts'] if a['outcome'] != 'ok']
+    if skipped:
+        status.info("Showing " + model_name + " because " + ", ".join(
+            f"{a['model']} {'ran out of time' if a['outcome'] == 'timeout' else 'failed'} after {a['seconds']:.0f}s"
+            for a in skipped) + ".")
+else:
+    if 'baseline' not in prediction:
+        baseline_name, baseline_rmse, baseline_predictions = best_baseline(prediction['scaled_data'])
+        baseline_forecast = forecast_frame(baseline_predictions, last_date=rolling_price.index[-1])
+        baseline_forecast['Close'] = inverse_scaling(prediction['scaler'], baseline_forecast['Close'])
+        prediction['baseline'] = baseline_name, baseline_rmse, baseline_forecast
+    baseline_name, baseline_rmse, baseline_forecast = prediction['baseline']
+    rmse, model_name = baseline_rmse, baseline_name
+    show_forecast(results, baseline_forecast, rmse, model_name)
+
+    if job['state'] == 'failed':
+        status.warning(f"The ARIMA model could not be fitted ({forecast_jobs.result(key)['error']}). "
+                       f"Showing the {baseline_name} baseline instead.")
+    else:
+        with status.container():
+            st.info(f"Showing the {baseline_name} baseline while the ARIMA model is "
+                    f"{'being fitted' if job['state'] == 'running' else 'queued'} ({job['elapsed']:.0f}s)...")
+            st.progress(job['progress'])
+        time.sleep(forecast_jobs.POLL_SECONDS)
+        st.session_state['prediction_poll'] = ticker
+        rerun = getattr(st, 'rerun', None) or st.experimental_rerun
+        rerun()
 
 # -------------------- RESULT EXPLANATION --------------------
 st.markdown("---")
@@ -65,6 +112,7 @@ st.markdown("## 🧠 Interpretation & Insights")
 st.markdown(f"""
 - **Stock Selected:** {ticker}  
 - **Forecast Horizon:** 30 trading days ahead  
+- **Model:** {model_name}  
 - **Model RMSE Score:** `{rmse:.4f}`  
     - RMSE measures prediction error — lower values mean more accurate forecasts.
 - **Forecast Data Table:** Shows the predicted daily closing prices for the next month.
@@ -0,0 +1,105 @@
+# ---------------------- IMPORTS ----------------------
+import time
+import streamlit as st
+from pages.utils import capm_state, price_store, screener, table_view
+
+# ---------------------- PAGE CONFIG ----------------------
+st.set_page_config(
+    page_title="Stock Screener",
+    page_icon="🔎",
+    layout="wide",
+)
+
+# ---------------------- HEADER ----------------------
+st.markdown(
+    """
+    <h1 style="text-align:center; color:#1E88E5;">🔎 Stock Screener</h1>
+    <p style="text-align:center; font-size:18px; color:#555;">
+    Filter and rank a whole universe of stocks on CAPM Beta, returns, volatility, technical indicators and fundamentals.
+    </p>
+    <hr style="height:2px; border:none; background-color:#1E88E5;">
+    """,
+    unsafe_allow_html=True
+)
+
+# ---------------------- USER INPUTS ----------------------
+col1, col2, col3 = st.columns(3)
+with col1:
+    universe_name = st.selectbox("🌐 Universe", ("Popular Stocks", "S&P 500"))
+with col2:
+    year = st.number_input("📅 Number of Years", min_value=1, max_value=10, value=5)
+with col3:
+    fetch_fundamentals = st.checkbox("Fetch missing fundamentals (slow on first run)", value=False)
+
+# ---------------------- DATA & METRICS ----------------------
+try:
+    tickers = price_store.POPULAR_TICKERS if universe_name == "Popular Stocks" else price_store.load_universe()
+    close = price_store.load_close_prices(tickers, years=year)
+    market = price_store.load_market(years=year)
+
+    # The metrics table is rebuilt only when the universe or its data changes
+    cache_key = (universe_name, year, fetch_fundamentals, close.index[-1], close.shape)
+    if st.session_state.get('screener_key') != cache_key:
+        fundamentals = price_store.load_fundamentals(list(close.columns), fetch=fetch_fundamentals)
+        state = capm_state.refresh_capm_state(list(close.columns), window=252 * year)
+        rf = price_store.load_risk_free(years=1).dropna().iloc[-1]
+        capm = capm_state.capm_from_state(state, rf=rf)
+        st.session_state['screener_table'] = screener.build_metrics(close, market, fundamentals, capm)
+        st.session_state['screener_key'] = cache_key
+    table = st.session_state['screener_table']
+    numeric = screener.numeric_columns(table)
+
+    # ---------------------- FILTERS ----------------------
+    st.markdown("### ⚙️ Filters")
+    filters = []
+    for row in range(3):
+        f1, f2, f3, f4 = st.columns([0.5, 2, 1, 1.5])
+        with f1:
+            enabled = st.checkbox("On", key=f"filter_on_{row}")
+        with f2:
+            column = st.selectbox("Metric", numeric, index=min(row, len(numeric) - 1), key=f"filter_col_{row}")
+        with f3:
+            op = st.selectbox("Operator", list(screener.OPERATORS), key=f"filter_op_{row}")
+        with f4:
+            value = st.number_input("Value", value=0.0, key=f"filter_val_{row}")
+        if enabled:
+            filters.append((column, op, value))
+
+    macd_states = ["Bullish", "Bearish", "N/A"]
+    macd_filter = st.multiselect("MACD State", macd_states, macd_states)
+    if set(macd_filter) != set(macd_states):
+        filters.append(('MACD', 'in', macd_filter))
+
+    # ---------------------- RANKING & PAGINATION ----------------------
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        sort_by = st.selectbox("Rank By", numeric, index=numeric.index('Return 1Y (%)'))
+    with col2:
+        ascending = st.checkbox("Ascending", value=False)
+    with col3:
+        page_size = st.selectbox("Rows per Page", (25, 50, 100), index=1)
+    with col4:
+        page = st.number_input("Page", min_value=1, value=1) - 1
+
+    started = time.perf_counter()
+    result, total = screener.screen(table, filters, sort_by, ascending, page, page_size)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    # ---------------------- RESULTS ----------------------
+    st.markdown("### 📋 Results")
+    st.caption(
+        f"Showing {min(page * page_size + 1, total)}–{min((page + 1) * page_size, total)} of {total} matches "
+        f"out of {len(table['Ticker'])} stocks (query took {elapsed:.1f} ms)"
+    )
+    table_view.table(result)
+
+    st.markdown("### 📊 Insights & Analysis")
+    st.markdown(
+        "- **Beta** is estimated against the S&P 500 from daily returns, exactly as on the CAPM pages."
+    )
+    st.markdown(
+        "- **RSI** above 70 signals overbought conditions and below 30 oversold; **MACD** is *Bullish* when the MACD line is above its signal line."
+    )
+
+except Exception as e:
+    st.error(f"⚠️ Unable to build the screener. Please try again later.\nError: {e}")
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar, GoodFriday, Holiday, USLaborDay, USMartinLutherKingJr, USMemorialDay,
+    USPresidentsDay, USThanksgivingDay, nearest_workday, sunday_to_monday
+)
+
+# Series are aligned on integer day numbers (days since 1970-01-01) instead of formatted
+# date strings, then laid out on an integer trading-day index with a 'Date' column.
+
+NAN_POLICIES = ('drop', 'ffill', 'pairwise')
+
+# Function to convert any date index (naive or tz-aware, any time of day) to day numbers
+def day_numbers(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize().to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+def _columns(series):
+    for name, values in series.items():
+        if isinstance(values, pd.DataFrame):
+            for column in values.columns:
+                yield column, values[column]
+        else:
+            yield name, values
+
+def _ffill(values):
+    rows = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return values[rows, np.arange(values.shape[1])]
+
+# Function to align any number of date-indexed series on one trading calendar.
+# `series` maps names to Series (or DataFrames whose columns are used as-is).
+# `calendar` is the set of trading days to keep: a date index, the name of one of the
+# series, or None for the union of all dates. `how` decides what happens to missing values:
+#   'drop'     - keep only days where every series has a value
+#   'ffill'    - carry the last known value forward, then drop the leading incomplete days
+#   'pairwise' - keep NaN so that pairwise statistics use every overlapping observation
+def align(series, how='drop', calendar=None):
+    if how not in NAN_POLICIES:
+        raise ValueError(f"how must be one of {NAN_POLICIES}, got {how!r}")
+    columns = list(_columns(series))
+    keys = [day_numbers(values.index) for _, values in columns]
+
+    if calendar is None:
+        days = np.unique(np.concatenate(keys))
+    elif isinstance(calendar, str):
+        days = np.unique(keys[[name for name, _ in columns].index(calendar)])
+    else:
+        days = np.unique(day_numbers(calendar))
+
+    data = np.full((len(days), len(columns)), np.nan)
+    for j, ((_, values), key) in enumerate(zip(columns, keys)):
+        pos = np.searchsorted(days, key)
+        pos_clipped = np.minimum(pos, len(days) - 1)
+        hit = (pos < len(days)) & (days[pos_clipped] == key)
+        data[pos[hit], j] = np.asarray(values, dtype=float)[hit]
+
+    if how == 'ffill':
+        data = _ffill(data)
+    if how in ('drop', 'ffill'):
+        keep = ~np.isnan(data).any(axis=1)
+        data, days = data[keep], days[keep]
+
+    aligned = pd.DataFrame(data, columns=[name for name, _ in columns])
+    aligned.insert(0, 'Date', days.astype('datetime64[D]').astype('datetime64[ns]'))
+    return aligned
+
+# Function to join stock prices with the market series on the stock's trading days
+def align_with_market(stocks, market, how='drop', market_name='sp500'):
+    if isinstance(stocks, pd.Series):
+        stocks = stocks.to_frame()
+    if 'Date' in stocks.columns:
+        stocks = stocks.set_index('Date')
+    return align({'stocks': stocks, market_name: market}, how=how,
+                 calendar=None if how == 'drop' else stocks.index)
+
+# NYSE holiday rules. Unlike the federal calendar the exchange closes on Good Friday and stays
+# open on Columbus Day and Veterans Day; a New Year's Day falling on a Saturday is not made up.
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    rules = [
+        Holiday('New Year\'s Day', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01', observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas Day', month=12, day=25, observance=nearest_workday),
+    ]
+
+# US exchange trading days (weekdays without NYSE holidays)
+TRADING_DAY = pd.offsets.CustomBusinessDay(calendar=NYSEHolidayCalendar())
+
+# Function to get the last trading day strictly before `date` (default: today)
+def previous_trading_day(date=None):
+    return pd.Timestamp(date or pd.Timestamp.today()).tz_localize(None).normalize() - TRADING_DAY
+
+# Function to list the next `periods` trading days after `last_date`
+def next_trading_days(last_date, periods):
+    start = pd.Timestamp(last_date).tz_localize(None).normalize() + TRADING_DAY
+    return pd.date_range(start, periods=periods, freq=TRADING_DAY)
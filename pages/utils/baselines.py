@@ -0,0 +1,120 @@
+import numpy as np
+from pages.utils.model_train import FORECAST_STEPS, evaluate_model
+
+# Cheap forecasters that run alongside ARIMA. They share fit_model's signature
+# (data, differencing_order, forecast_steps) so evaluate_model can score them, and they are
+# vectorized over series: `data` is one series or a 2-D array with time along axis 0 and one
+# series per column (like a wide Date x ticker frame), without missing values.
+# The differencing order is not used by these models.
+
+SMOOTHING_GRID = np.linspace(0.05, 0.95, 10)
+
+def _as_columns(data):
+    y = np.asarray(data, dtype=float)
+    return y.reshape(len(y), -1), y.ndim == 1 or y.shape[1] == 1
+
+def _output(predictions, single):
+    return predictions[:, 0] if single else predictions
+
+# Function to repeat the last observation
+def naive(data, differencing_order=0, forecast_steps=FORECAST_STEPS):
+    y, single = _as_columns(data)
+    return _output(np.repeat(y[-1:], forecast_steps, axis=0), single)
+
+# Function to extend the line between the first and the last observation
+def drift(data, differencing_order=0, forecast_steps=FORECAST_STEPS):
+    y, single = _as_columns(data)
+    slope = (y[-1] - y[0]) / (len(y) - 1)
+    steps = np.arange(1, forecast_steps + 1)[:, None]
+    return _output(y[-1] + steps * slope, single)
+
+# Function to repeat the last season (5 trading days = one week)
+def seasonal_naive(data, differencing_order=0, forecast_steps=FORECAST_STEPS, season=5):
+    y, single = _as_columns(data)
+    rows = len(y) - season + np.arange(forecast_steps) % season
+    return _output(y[rows], single)
+
+# Function to run exponential smoothing for every (smoothing parameter, series) pair at once;
+# returns the final level, trend and the sum of squared one-step errors, each (parameters, series)
+def _smooth(y, alphas, betas=None):
+    shape = (len(alphas), y.shape[1])
+    level = np.broadcast_to(y[0], shape).copy()
+    trend = np.zeros(shape) if betas is None else np.broadcast_to(y[1] - y[0], shape).copy()
+    sse = np.zeros(shape)
+    alphas = alphas[:, None]
+    for t in range(1, len(y)):
+        forecast = level + trend
+        error = y[t] - forecast
+        sse += error * error
+        new_level = forecast + alphas * error
+        if betas is not None:
+            trend = trend + betas[:, None] * (new_level - level - trend)
+        level = new_level
+    return level, trend, sse
+
+# Function for simple exponential smoothing; the smoothing parameter of each series is the
+# grid value with the smallest one-step-ahead squared error
+def exponential_smoothing(data, differencing_order=0, forecast_steps=FORECAST_STEPS):
+    y, single = _as_columns(data)
+    level, _, sse = _smooth(y, SMOOTHING_GRID)
+    best = np.argmin(sse, axis=0)
+    columns = np.arange(y.shape[1])
+    return _output(np.repeat(level[best, columns][None, :], forecast_steps, axis=0), single)
+
+# Function for Holt's linear trend method, with both parameters chosen from the grid
+def holt(data, differencing_order=0, forecast_steps=FORECAST_STEPS):
+    y, single = _as_columns(data)
+    alphas, betas = (g.ravel() for g in np.meshgrid(SMOOTHING_GRID, SMOOTHING_GRID[:5]))
+    level, trend, sse = _smooth(y, alphas, betas)
+    best = np.argmin(sse, axis=0)
+    columns = np.arange(y.shape[1])
+    steps = np.arange(1, forecast_steps + 1)[:, None]
+    return _output(level[best, columns] + steps * trend[best, columns], single)
+
+# Function for an AR(p) model with intercept, fitted by least squares on the lag matrix of
+# every series in one batched solve, then iterated forward
+def autoregressive(data, differencing_order=0, forecast_steps=FORECAST_STEPS, lags=5):
+    y, single = _as_columns(data)
+    rows = len(y) - lags
+    # design matrices: (series, rows, 1 + lags) with column k+1 holding lag k+1
+    windows = np.stack([y[lags - k - 1:lags - k - 1 + rows] for k in range(lags)], axis=-1)
+    X = np.concatenate([np.ones((rows, y.shape[1], 1)), windows], axis=-1).transpose(1, 0, 2)
+    target = y[lags:].T[:, :, None]
+    XtX = X.transpose(0, 2, 1) @ X + 1e-8 * np.eye(lags + 1)
+    coef = np.linalg.solve(XtX, X.transpose(0, 2, 1) @ target)[:, :, 0]
+
+    history = list(y[-lags:])
+    predictions = np.empty((forecast_steps, y.shape[1]))
+    for h in range(forecast_steps):
+        recent = np.stack(history[::-1][:lags], axis=-1)
+        predictions[h] = coef[:, 0] + (coef[:, 1:] * recent).sum(axis=1)
+        history.append(predictions[h])
+    return _output(predictions, single)
+
+BASELINES = {
+    'Naive': naive,
+    'Drift': drift,
+    'Seasonal Naive': seasonal_naive,
+    'Exponential Smoothing': exponential_smoothing,
+    'Holt': holt,
+    'AR(5)': autoregressive,
+}
+
+# Function to score every baseline with evaluate_model; returns {name: rmse}, with one RMSE
+# per column for 2-D data
+def evaluate_baselines(original_price, differencing_order=0):
+    return {name: evaluate_model(original_price, differencing_order, fit) for name, fit in BASELINES.items()}
+
+# Function to pick the baseline with the lowest RMSE and forecast with it; for 2-D data the
+# baseline is picked per column and names, RMSEs and forecast columns are returned per column
+def best_baseline(original_price, differencing_order=0, forecast_steps=FORECAST_STEPS):
+    scores = evaluate_baselines(original_price, differencing_order)
+    if np.ndim(next(iter(scores.values()))) == 0:
+        name = min(scores, key=scores.get)
+        return name, scores[name], BASELINES[name](original_price, differencing_order, forecast_steps)
+    names = list(scores)
+    table = np.stack([scores[name] for name in names])
+    best = np.argmin(table, axis=0)
+    forecasts = np.stack([BASELINES[name](original_price, differencing_order, forecast_steps) for name in names])
+    columns = np.arange(table.shape[1])
+    return [names[i] for i in best], table[best, columns], forecasts[best, :, columns].T
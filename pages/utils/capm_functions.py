@@ -1,42 +1,105 @@
-import plotly.express as px
 import numpy as np
+import pandas as pd
+from pages.utils.alignment import day_numbers
+from pages.utils.lazy_import import lazy_import
 
-# Function to plot interactive plot
-def interactive_plot(df):
-    fig = px.line()
-    for i in df.columns[1:]:
-         fig.add_scatter(x = df['Date'],y = df[i], name = i)
+go = lazy_import('plotly.graph_objects')
+
+# Series count above which the legend is hidden (hover still names each line)
+LEGEND_LIMIT = 20
+# Total plotted points above which charts switch to WebGL traces
+WEBGL_POINTS = 50_000
+
+# Function to pick evenly spaced row positions (first and last always kept) so each series
+# has at most `max_points` points
+def downsample_positions(rows, max_points=None):
+    if not max_points or rows <= max_points:
+        return np.arange(rows)
+    return np.unique(np.linspace(0, rows - 1, max_points).round().astype(np.int64))
+
+# Function to plot interactive plot; every column after the first ('Date') becomes one line.
+# All traces are sliced from one column-major value array and handed to the figure at once.
+# `max_points` downsamples each series, `webgl` forces (True/False) or auto-selects WebGL.
+def interactive_plot(df, max_points=None, webgl=None):
+    names = list(df.columns[1:])
+    positions = downsample_positions(len(df), max_points)
+    x = df.iloc[positions, 0].to_numpy()
+    values = df.iloc[positions, 1:].to_numpy(dtype=np.float64).ravel(order='F')
+    if webgl is None:
+        webgl = len(values) > WEBGL_POINTS
+    trace = go.Scattergl if webgl else go.Scatter
+    n = len(positions)
+    traces = [trace(x=x, y=values[i * n:(i + 1) * n], name=name, mode='lines') for i, name in enumerate(names)]
+    fig = go.Figure(data=traces)
     fig.update_layout(width = 450,margin=dict(l=20, r=20, t=50, b=20),legend=dict(orientation="h",yanchor="bottom",
     y=1.02,
     xanchor="right",
-    x=1))
+    x=1), showlegend=len(names) <= LEGEND_LIMIT)
     return fig
 
-# Function to normalize the prices based on the initial price
-def normalize(df):
-    x = df.copy()
-    for i in x.columns[1:]:
-        x[i]=x[i]/x[i][0]
+# Function to normalize the prices based on the price at `base_date` (first row by default);
+# a ticker without a price on that day is based on its first price after it
+def normalize(df, base_date=None):
+    prices = df.iloc[:, 1:]
+    base = 0
+    if base_date is not None:
+        base = int(np.searchsorted(pd.to_datetime(df.iloc[:, 0]).to_numpy(), np.datetime64(pd.Timestamp(base_date))))
+        base = min(base, len(df) - 1)
+    base_prices = prices.iloc[base]
+    if base_prices.isna().any():
+        base_prices = prices.iloc[base:].bfill().iloc[0]
+    x = pd.DataFrame(prices.to_numpy() / base_prices.to_numpy(), index=df.index, columns=prices.columns, copy=False)
+    x.insert(0, df.columns[0], df.iloc[:, 0])
     return x
 
-# Function to calculate the daily returns 
+# Function to calculate the daily returns (always float64, they feed the regressions)
 def daily_return(df):
-    df_daily_return = df.copy()
-    for i in df.columns[1:]:
-        for j in range(1,len(df)):
-            df_daily_return[i][j] = ((df[i][j]-df[i][j-1]) / df[i][j-1])*100
-        df_daily_return[i][0]=0
+    prices = df.iloc[:, 1:].to_numpy(dtype=np.float64)
+    returns = np.empty_like(prices)
+    returns[0] = 0
+    np.subtract(prices[1:], prices[:-1], out=returns[1:])
+    np.divide(returns[1:], prices[:-1], out=returns[1:])
+    returns[1:] *= 100
+    df_daily_return = pd.DataFrame(returns, index=df.index, columns=df.columns[1:], copy=False)
+    df_daily_return.insert(0, df.columns[0], df.iloc[:, 0])
     return df_daily_return
 
-# Function to calculate beta
-def calculate_beta(stocks_daily_return, stock):
-    # Assume risk free rate is zero
-    
-    rm = stocks_daily_return['sp500'].mean()*252
+# Function to turn an annualised risk-free rate series (%, e.g. FRED DTB3) into daily risk-free
+# returns (%) on `dates`; each day uses the latest rate published on or before it
+def daily_risk_free(rates, dates):
+    rates = rates.dropna()
+    positions = np.searchsorted(day_numbers(rates.index), day_numbers(dates), side='right') - 1
+    return rates.to_numpy(dtype=np.float64)[np.maximum(positions, 0)] / 252
+
+# Function to calculate beta (on excess returns when daily risk-free returns `rf` are given)
+def calculate_beta(stocks_daily_return, stock, rf=None):
+    rf = 0 if rf is None else rf
     # Fit a polynomial between each stock and the S&P500
-    b, a = np.polyfit(stocks_daily_return['sp500'], stocks_daily_return[stock], 1)
+    b, a = np.polyfit(stocks_daily_return['sp500'] - rf, stocks_daily_return[stock] - rf, 1)
     return b,a
 
+# Function to calculate beta and alpha of every stock column at once (pairwise NaN handling);
+# with daily risk-free returns `rf` (scalar or one value per row) betas are on excess returns
+def calculate_betas(stocks_daily_return, market='sp500', rf=None):
+    stocks = [c for c in stocks_daily_return.columns if c not in ('Date', market)]
+    rf = 0 if rf is None else np.asarray(rf, dtype=float).reshape(-1, 1)
+    y = stocks_daily_return[stocks].to_numpy(dtype=float) - rf
+    x = stocks_daily_return[market].to_numpy(dtype=float)[:, None] - rf
+    mask = ~(np.isnan(x) | np.isnan(y))
+    n = mask.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = np.where(mask, x, 0).sum(axis=0) / n
+        mean_y = np.where(mask, y, 0).sum(axis=0) / n
+        dx = np.where(mask, x - mean_x, 0)
+        dy = np.where(mask, y - mean_y, 0)
+        b = (dx * dy).sum(axis=0) / (dx * dx).sum(axis=0)
+    a = mean_y - b * mean_x
+    return pd.Series(b, index=stocks), pd.Series(a, index=stocks)
 
-
-
+# Function to calculate CAPM expected returns (annualised %) for one beta or a Series of betas:
+# rf + beta * (rm - rf), with rf the latest risk-free rate and rm - rf the average market
+# excess return over the period
+def expected_return(beta, stocks_daily_return, rf, market='sp500'):
+    premium = np.nanmean(stocks_daily_return[market].to_numpy(dtype=float) - rf) * 252
+    rf_now = float(np.atleast_1d(rf)[-1]) * 252
+    return rf_now + beta * premium
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+from pages.utils import alignment, price_store
+from pages.utils.capm_functions import daily_risk_free
+
+# Running CAPM sums per ticker (x = market daily return, y = stock daily return, r = daily
+# risk-free return, in %). Beta, alpha and the expected return on excess returns only need
+# these sums, so new daily bars are added (and, for a rolling window, expiring bars
+# subtracted) without touching the rest of the history.
+
+STATE_COLUMNS = ['n', 'sum_x', 'sum_y', 'sum_xx', 'sum_xy', 'sum_yy', 'sum_r', 'sum_rr', 'sum_rx', 'sum_ry']
+
+def _state_file(window):
+    return f'capm_state_{window or "all"}.parquet'
+
+def _returns(prices):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (prices[1:] / prices[:-1] - 1) * 100
+
+# Function to get the daily risk-free return (%) on `dates` from the annualised `rates`
+# (zero without rates)
+def _risk_free(rates, dates):
+    if rates is None:
+        return np.zeros(len(dates))
+    return daily_risk_free(rates, dates)
+
+# Function to add up the CAPM sums column-wise, skipping days where either return is missing
+def _sums(stock_returns, market_returns, rf):
+    x = market_returns[:, None]
+    mask = ~(np.isnan(stock_returns) | np.isnan(x))
+    x = np.where(mask, x, 0)
+    y = np.where(mask, stock_returns, 0)
+    r = np.where(mask, rf[:, None], 0)
+    return np.stack([mask.sum(axis=0), x.sum(axis=0), y.sum(axis=0),
+                     (x * x).sum(axis=0), (x * y).sum(axis=0), (y * y).sum(axis=0),
+                     r.sum(axis=0), (r * r).sum(axis=0), (r * x).sum(axis=0), (r * y).sum(axis=0)], axis=1)
+
+# Function to build the CAPM state from an aligned price frame (Date, tickers..., market);
+# `window` keeps only the latest `window` daily returns; `rates` is the annualised risk-free
+# rate in % (a date-indexed series such as price_store.load_risk_free())
+def init_capm_state(aligned, window=None, market='sp500', rates=None):
+    tickers = [c for c in aligned.columns if c not in ('Date', market)]
+    returns = _returns(aligned[tickers + [market]].to_numpy(dtype=float))
+    rf = _risk_free(rates, aligned['Date'])[1:]
+    if window:
+        returns, rf = returns[-window:], rf[-window:]
+    state = pd.DataFrame(_sums(returns[:, :-1], returns[:, -1], rf), index=tickers, columns=STATE_COLUMNS)
+    state['window'] = window or 0
+    state['first_date'] = aligned['Date'].iloc[-len(returns)]
+    state['last_date'] = aligned['Date'].iloc[-1]
+    return state
+
+# Function to roll the CAPM state forward over the bars of `aligned` newer than `last_date`.
+# `calendar` holds every trading day of the price history (default: the dates of `aligned`);
+# `aligned` then only needs the bars that `needed_rows` selects from it.
+def update_capm_state(state, aligned, market='sp500', calendar=None, rates=None):
+    state = state.copy()
+    dates = aligned['Date'].to_numpy()
+    calendar = dates if calendar is None else pd.DatetimeIndex(calendar).to_numpy(dtype='datetime64[ns]')
+    for (first_date, last_date, window), group in state.groupby(['first_date', 'last_date', 'window']):
+        tickers = list(group.index)
+        prices = aligned[tickers + [market]].to_numpy(dtype=float)
+        last = np.searchsorted(calendar, np.datetime64(last_date))
+        new = _returns(prices[np.searchsorted(dates, calendar[last:])])
+        if len(new) == 0:
+            continue
+        rf = _risk_free(rates, calendar[last + 1:])
+        sums = group[STATE_COLUMNS].to_numpy(dtype=float) + _sums(new[:, :-1], new[:, -1], rf)
+
+        if window:
+            first = np.searchsorted(calendar, np.datetime64(first_date))
+            expiring = max(0, (last - first + 1) + len(new) - window)
+            if expiring:
+                old = _returns(prices[np.searchsorted(dates, calendar[first - 1:first + expiring])])
+                sums -= _sums(old[:, :-1], old[:, -1], _risk_free(rates, calendar[first:first + expiring]))
+                state.loc[tickers, 'first_date'] = calendar[first + expiring]
+        state.loc[tickers, STATE_COLUMNS] = sums
+        state.loc[tickers, 'last_date'] = calendar[-1]
+    return state
+
+# Function to mark the days of `calendar` that update_capm_state reads for `state`: the bars
+# from each `last_date` on and, for a rolling window, the bars that drop out of it
+def needed_rows(state, calendar):
+    calendar = pd.DatetimeIndex(calendar)
+    mask = np.zeros(len(calendar), dtype=bool)
+    for (first_date, last_date, window), _ in state.groupby(['first_date', 'last_date', 'window']):
+        last = calendar.searchsorted(last_date)
+        mask[last:] = True
+        if window:
+            first = calendar.searchsorted(first_date)
+            expiring = max(0, len(calendar) - first - window)
+            mask[max(first - 1, 0):first + expiring] = True
+    return mask
+
+# Function to turn the CAPM state into beta, alpha and the annualised expected return (%),
+# all on excess returns. `rf` is the current annualised risk-free rate in %; by default the
+# average rate over the state's window is used.
+def capm_from_state(state, rf=None):
+    n, sx, sy, sxx, sxy, _, sr, srr, srx, sry = (state[c].to_numpy(dtype=float) for c in STATE_COLUMNS)
+    # sums of the excess returns x - r and y - r
+    ex, ey = sx - sr, sy - sr
+    exx = sxx - 2 * srx + srr
+    exy = sxy - srx - sry + srr
+    with np.errstate(invalid='ignore', divide='ignore'):
+        beta = (n * exy - ex * ey) / (n * exx - ex * ex)
+        alpha = (ey - beta * ex) / n
+        premium = ex / n * 252
+        rf = sr / n * 252 if rf is None else rf
+    return pd.DataFrame({
+        'Beta': beta,
+        'Alpha': alpha,
+        'Expected Return (%)': rf + beta * premium,
+    }, index=state.index)
+
+# Function to get the last day whose bars may be added to the state: a finished session on
+# which the market and the risk-free rate are both published. Later bars are left for the next
+# refresh, since a day once added is never revisited (FRED usually trails Yahoo by a session,
+# and the price cache can hold today's still-forming bar).
+def last_complete_day(market, rates):
+    return min(market.dropna().index[-1], rates.dropna().index[-1], alignment.previous_trading_day())
+
+# Function to bring the cached CAPM state of `tickers` up to date with the price cache.
+# Known tickers only pay for the bars added since the last refresh.
+def refresh_capm_state(tickers, window=None):
+    close = price_store.load_close_prices(tickers, years=10)
+    market = price_store.load_market(years=10)
+    rates = price_store.load_risk_free(years=11)
+    close = close.loc[close.index <= last_complete_day(market, rates)]
+    cached = price_store.read_cache(_state_file(window))
+    if cached is not None and not set(STATE_COLUMNS) <= set(cached.columns):
+        # written before the risk-free sums were kept: rebuild
+        cached = None
+    state = None if cached is None else cached[cached.index.isin(close.columns)]
+
+    known = [] if state is None else list(state.index)
+    missing = [t for t in close.columns if t not in known]
+    if known:
+        rows = needed_rows(state, close.index)
+        recent = alignment.align_with_market(close.loc[rows, known], market, how='pairwise')
+        state = update_capm_state(state, recent, calendar=close.index, rates=rates)
+    if missing:
+        history = alignment.align_with_market(close[missing], market, how='pairwise')
+        fresh = init_capm_state(history, window, rates=rates)
+        state = fresh if state is None else pd.concat([state, fresh])
+
+    # tickers that were not asked for this time stay in the cache untouched
+    if cached is not None:
+        state = pd.concat([cached[~cached.index.isin(state.index)], state])
+    price_store.write_cache(state, _state_file(window))
+    return state.reindex(tickers)
+
+# Nightly refresh of the cached CAPM state for the whole universe:
+#   python -m pages.utils.capm_state [window]
+if __name__ == '__main__':
+    import sys
+    window = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    state = refresh_capm_state(price_store.load_universe(), window)
+    print(capm_from_state(state.dropna()).round(3).to_string())
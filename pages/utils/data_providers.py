@@ -0,0 +1,298 @@
+import abc
+import datetime
+import glob
+import json
+import os
+import threading
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from pages.utils.lazy_import import lazy_import
+
+yf = lazy_import('yfinance')
+web = lazy_import('pandas_datareader.data')
+
+# Market-data access for the whole app goes through a provider. Every provider answers the same
+# batched range queries with the same schema:
+#   get_prices(tickers, start, end, field)  wide frame, 'Date' index x one column per ticker
+#   get_ohlcv(ticker, start, end, interval) Open/High/Low/Close/Volume frame, 'Date' index
+#   get_series(names, start, end)           wide frame of macro series (FRED names, e.g. 'sp500')
+#   get_info(ticker)                        dict of company fundamentals
+#   get_fama_french(start, end)             daily Fama-French factors (%): Mkt-RF, SMB, HML, RF
+# Dates are timezone-naive; intraday bars are in exchange (New York) time.
+#
+# The provider is chosen with MARKET_DATA_PROVIDER:
+#   yahoo (default)  Yahoo Finance prices with FRED series
+#   local:<dir>      Parquet/CSV files in <dir>, see LocalProvider
+#   synthetic[:<s>]  deterministic random walks, optionally sleeping <s> seconds per request
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+EXCHANGE_TZ = 'America/New_York'
+
+# Function to turn a Yahoo-style period ('5d', '1mo', '6mo', 'ytd', '1y', '5y', 'max') into a start date
+def period_start(period, today=None):
+    today = pd.Timestamp(today or datetime.date.today()).normalize()
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return pd.Timestamp(today.year, 1, 1)
+    number, unit = int(period.rstrip('dmoy')), period.lstrip('0123456789')
+    offsets = {'d': pd.DateOffset(days=number), 'mo': pd.DateOffset(months=number), 'y': pd.DateOffset(years=number)}
+    return today - offsets[unit]
+
+def _naive_dates(df):
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert(EXCHANGE_TZ).tz_localize(None)
+    df.index = index
+    df.index.name = 'Date'
+    return df[~df.index.duplicated(keep='last')].sort_index()
+
+def _between(df, start=None, end=None):
+    if start is not None:
+        df = df[df.index >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df.index < pd.Timestamp(end)]
+    return df
+
+# Prices and series are required; fundamentals and factors are optional
+class MarketDataProvider(abc.ABC):
+    name = 'base'
+
+    @abc.abstractmethod
+    def get_prices(self, tickers, start=None, end=None, field='Close'):
+        pass
+
+    @abc.abstractmethod
+    def get_ohlcv(self, ticker, start=None, end=None, interval='1d'):
+        pass
+
+    @abc.abstractmethod
+    def get_series(self, names, start=None, end=None):
+        pass
+
+    def get_info(self, ticker):
+        return {}
+
+    def get_fama_french(self, start=None, end=None):
+        raise NotImplementedError(f"{self.name} provider has no Fama-French factors")
+
+class YahooProvider(MarketDataProvider):
+    name = 'yahoo'
+
+    def _download(self, tickers, start, end, interval='1d', auto_adjust=False):
+        kwargs = {'start': start, 'end': end} if start is not None else {'period': 'max'}
+        return yf.download(list(tickers), interval=interval, progress=False, threads=True,
+                           auto_adjust=auto_adjust, **kwargs)
+
+    def get_prices(self, tickers, start=None, end=None, field='Close'):
+        tickers = list(tickers)
+        data = self._download(tickers, start, end)
+        if len(data) == 0:
+            return pd.DataFrame(columns=tickers)
+        data = data[field]
+        if isinstance(data, pd.Series):
+            data = data.to_frame(tickers[0])
+        return _naive_dates(data.dropna(how='all', axis=1))
+
+    def get_ohlcv(self, ticker, start=None, end=None, interval='1d'):
+        # split- and dividend-adjusted, so candles and indicators have no jumps at corporate actions
+        data = self._download([ticker], start, end, interval, auto_adjust=True)
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.get_level_values(0)
+        return _naive_dates(data[OHLCV].dropna(subset=['Close']))
+
+    def get_series(self, names, start=None, end=None):
+        return FredProvider().get_series(names, start, end)
+
+    def get_info(self, ticker):
+        return yf.Ticker(ticker).info
+
+    # Kenneth French's data library, served by pandas-datareader
+    def get_fama_french(self, start=None, end=None):
+        start = start if start is not None else datetime.date.today() - datetime.timedelta(days=3660)
+        factors = web.DataReader('F-F_Research_Data_Factors_daily', 'famafrench', start, end)[0]
+        factors.index = factors.index.to_timestamp() if isinstance(factors.index, pd.PeriodIndex) else factors.index
+        return _naive_dates(factors)
+
+# FRED macro series only; YahooProvider uses it for get_series
+class FredProvider:
+    name = 'fred'
+
+    def get_series(self, names, start=None, end=None):
+        start = start if start is not None else datetime.date.today() - datetime.timedelta(days=3660)
+        return _naive_dates(web.DataReader(list(names), 'fred', start, end))
+
+# Files in `directory`, one per ticker or series, as <name>.parquet or <name>.csv with a 'Date'
+# column (or index) plus OHLCV columns for tickers or one value column for series.
+# Optional <name>.info.json files hold fundamentals and fama_french.parquet/.csv the factors.
+class LocalProvider(MarketDataProvider):
+    name = 'local'
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _read(self, name):
+        path = os.path.join(self.directory, name)
+        if os.path.exists(path + '.parquet'):
+            df = pd.read_parquet(path + '.parquet')
+        elif os.path.exists(path + '.csv'):
+            df = pd.read_csv(path + '.csv')
+        else:
+            raise FileNotFoundError(f"No local data for {name!r} in {self.directory}")
+        if 'Date' in df.columns:
+            df = df.set_index('Date')
+        return _naive_dates(df)
+
+    def get_prices(self, tickers, start=None, end=None, field='Close'):
+        frames = {}
+        for ticker in tickers:
+            try:
+                frames[ticker] = self._read(ticker)[field]
+            except FileNotFoundError:
+                continue
+        return _between(pd.DataFrame(frames), start, end)
+
+    def get_ohlcv(self, ticker, start=None, end=None, interval='1d'):
+        name = ticker if interval == '1d' else f'{ticker}_{interval}'
+        return _between(self._read(name)[OHLCV], start, end)
+
+    def get_series(self, names, start=None, end=None):
+        return _between(pd.concat([self._read(name).iloc[:, 0].rename(name) for name in names], axis=1), start, end)
+
+    def get_fama_french(self, start=None, end=None):
+        return _between(self._read('fama_french'), start, end)
+
+    def get_info(self, ticker):
+        path = os.path.join(self.directory, f'{ticker}.info.json')
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    # Function to list the tickers available in the directory
+    def tickers(self):
+        names = [os.path.basename(p).split('.')[0] for p in glob.glob(os.path.join(self.directory, '*.*'))]
+        return sorted(set(n for n in names if '_' not in n))
+
+# Deterministic random walks (seeded by name) covering the last `years` of trading days, with
+# an optional sleep per request to mimic network latency. Used for offline benchmarks.
+class SyntheticProvider(MarketDataProvider):
+    name = 'synthetic'
+
+    # FRED-style series: name -> (start level, daily drift, daily volatility)
+    SERIES = {'sp500': (3000.0, 0.0003, 0.011), 'DTB3': (4.0, 0.0, 0.0)}
+
+    def __init__(self, years=10, latency=0.0):
+        self.dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=252 * years, name='Date')
+        self.latency = latency
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _ohlcv(self, ticker):
+        with self._lock:
+            if ticker not in self._cache:
+                rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+                n = len(self.dates)
+                close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+                spread = close * rng.uniform(0, 0.01, n)
+                self._cache[ticker] = pd.DataFrame({
+                    'Open': close + rng.normal(0, 0.5, n) * spread,
+                    'High': close + spread,
+                    'Low': close - spread,
+                    'Close': close,
+                    'Volume': rng.integers(100_000, 10_000_000, n),
+                }, index=self.dates)
+            return self._cache[ticker]
+
+    def _intraday(self, ticker, interval):
+        daily = self._ohlcv(ticker)
+        minutes = int(interval.rstrip('m'))
+        bars = 390 // minutes
+        rng = np.random.default_rng(zlib.crc32(f'{ticker}/{interval}'.encode()))
+        steps = rng.normal(0, 0.02 / np.sqrt(bars), (len(daily), bars))
+        # each day's path runs from the previous close to that day's close
+        path = np.cumsum(steps, axis=1)
+        path -= np.linspace(0, 1, bars) * path[:, -1:]
+        previous = np.concatenate([[daily['Close'].iloc[0]], daily['Close'].to_numpy()[:-1]])
+        log_prices = np.log(previous)[:, None] + path + np.linspace(0, 1, bars) * np.log(daily['Close'].to_numpy() / previous)[:, None]
+        close = np.exp(log_prices).ravel()
+        index = (daily.index.to_numpy()[:, None] + pd.Timedelta('9h30min').to_timedelta64()
+                 + np.arange(bars) * pd.Timedelta(minutes=minutes).to_timedelta64()).ravel()
+        return pd.DataFrame({'Open': close, 'High': close * 1.0005, 'Low': close * 0.9995, 'Close': close,
+                             'Volume': np.repeat(daily['Volume'].to_numpy() // bars, bars)},
+                            index=pd.DatetimeIndex(index, name='Date'))
+
+    def get_prices(self, tickers, start=None, end=None, field='Close'):
+        self._wait()
+        return _between(pd.DataFrame({t: self._ohlcv(t)[field] for t in tickers}, index=self.dates), start, end)
+
+    def get_ohlcv(self, ticker, start=None, end=None, interval='1d'):
+        self._wait()
+        data = self._ohlcv(ticker) if interval == '1d' else self._intraday(ticker, interval)
+        return _between(data, start, end).copy()
+
+    def get_series(self, names, start=None, end=None):
+        self._wait()
+        columns = {}
+        for name in names:
+            level, drift, volatility = self.SERIES.get(name, (100.0, 0.0, 0.01))
+            rng = np.random.default_rng(zlib.crc32(name.encode()))
+            columns[name] = level * np.exp(np.cumsum(rng.normal(drift, volatility, len(self.dates))))
+        return _between(pd.DataFrame(columns, index=self.dates), start, end)
+
+    def get_fama_french(self, start=None, end=None):
+        self._wait()
+        rng = np.random.default_rng(zlib.crc32(b'fama_french'))
+        n = len(self.dates)
+        factors = pd.DataFrame({
+            'Mkt-RF': rng.normal(0.03, 1.1, n),
+            'SMB': rng.normal(0.0, 0.5, n),
+            'HML': rng.normal(0.0, 0.6, n),
+            'RF': np.full(n, 0.016),
+        }, index=self.dates)
+        return _between(factors, start, end)
+
+    def get_info(self, ticker):
+        rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+        return {
+            'longName': f'{ticker} Inc.',
+            'sector': ['Technology', 'Healthcare', 'Financial Services', 'Energy'][int(rng.integers(4))],
+            'marketCap': float(rng.uniform(1e9, 2e12)),
+            'trailingPE': float(rng.uniform(5, 60)),
+            'trailingEps': float(rng.uniform(-2, 15)),
+            'returnOnEquity': float(rng.uniform(-0.1, 0.5)),
+            'profitMargins': float(rng.uniform(-0.1, 0.4)),
+            'debtToEquity': float(rng.uniform(0, 250)),
+            'beta': float(rng.uniform(0.3, 2.0)),
+        }
+
+_provider = None
+
+# Function to create the provider described by a MARKET_DATA_PROVIDER-style spec
+def make_provider(spec='yahoo'):
+    kind, _, argument = spec.partition(':')
+    if kind == 'yahoo':
+        return YahooProvider()
+    if kind == 'local':
+        return LocalProvider(argument)
+    if kind == 'synthetic':
+        return SyntheticProvider(latency=float(argument or 0))
+    raise ValueError(f"Unknown market data provider {spec!r}")
+
+# Function to get the app-wide provider
+def get_provider():
+    global _provider
+    if _provider is None:
+        _provider = make_provider(os.environ.get('MARKET_DATA_PROVIDER', 'yahoo'))
+    return _provider
+
+# Function to replace the app-wide provider (benchmarks, load tests)
+def set_provider(provider):
+    global _provider
+    _provider = provider
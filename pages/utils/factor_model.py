@@ -0,0 +1,174 @@
+import argparse
+import numpy as np
+import pandas as pd
+from pages.utils import alignment, capm_functions, price_store
+
+# Multi-factor regressions for many tickers at once:
+#   r_stock - rf = alpha + b_1 * f_1 + ... + b_k * f_k + e
+# The factor matrix is shared by every ticker, so it is factorised once (QR) and each ticker
+# only costs a matrix product; tickers with missing days are grouped by their missing-data
+# pattern and every pattern gets its own factorisation. Rolling windows solve the normal
+# equations of all windows at once from cumulative sums of the cross products.
+# Returns are daily and in %, as in capm_functions.
+
+# Factor sets that can be loaded from the local store
+SECTOR_ETFS = ['XLK', 'XLF', 'XLV', 'XLE', 'XLY', 'XLP', 'XLI', 'XLU', 'XLB', 'XLRE', 'XLC']
+FAMA_FRENCH = ['Mkt-RF', 'SMB', 'HML']
+FACTOR_SETS = ('market', 'sectors', 'fama_french')
+
+def _design(factors):
+    return np.column_stack([np.ones(len(factors)), factors])
+
+# Function to solve OLS of every column of `y` on the same design matrix `x` with one QR
+# factorisation; returns coefficients (k x n) and R squared (n)
+def _solve(x, y):
+    q, r = np.linalg.qr(x)
+    coef = np.linalg.solve(r, q.T @ y)
+    residual = y - x @ coef
+    total = y - y.mean(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r2 = 1 - (residual * residual).sum(axis=0) / (total * total).sum(axis=0)
+    return coef, r2
+
+# Function to group the columns of a boolean (days x tickers) mask by identical pattern;
+# yields (pattern, column positions). Columns are hashed as packed bytes, which is much
+# faster than np.unique(axis=1) on wide masks.
+def _patterns(valid):
+    packed = np.ascontiguousarray(np.packbits(valid, axis=0).T)
+    keys = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+    _, first, groups = np.unique(keys, return_index=True, return_inverse=True)
+    for g, column in enumerate(first):
+        yield valid[:, column], np.flatnonzero(groups.ravel() == g)
+
+# Function to estimate alpha and factor betas of every stock column at once.
+# `stock_returns` (days x tickers) and `factor_returns` (days x factors) are row-aligned
+# frames; `rf` (scalar or one value per day) is subtracted from the stock returns only,
+# so excess-return factors such as Mkt-RF are used as they are. Days with a missing factor
+# are dropped; a missing stock return only drops that day for that stock.
+# Returns one row per ticker: Alpha, one beta per factor, R2 and the number of days used.
+def factor_betas(stock_returns, factor_returns, rf=None):
+    tickers = list(stock_returns.columns)
+    names = list(factor_returns.columns)
+    rf = 0 if rf is None else np.asarray(rf, dtype=float).reshape(-1, 1)
+    y = stock_returns.to_numpy(dtype=float) - rf
+    f = factor_returns.to_numpy(dtype=float)
+    complete = ~np.isnan(f).any(axis=1)
+    x, y = _design(f[complete]), y[complete]
+
+    coef = np.full((len(names) + 1, len(tickers)), np.nan)
+    r2 = np.full(len(tickers), np.nan)
+    n = np.zeros(len(tickers), dtype=np.int64)
+    valid = ~np.isnan(y)
+    for rows, columns in _patterns(valid):
+        n[columns] = rows.sum()
+        if rows.sum() <= x.shape[1]:
+            continue
+        coef[:, columns], r2[columns] = _solve(x[rows], y[np.ix_(rows, columns)])
+
+    result = pd.DataFrame(coef.T, index=tickers, columns=['Alpha'] + names)
+    result['R2'] = r2
+    result['n'] = n
+    return result
+
+# Function to estimate alpha and factor betas over rolling windows of `window` days, every
+# `step` days. Windows with a missing factor or stock return for a ticker are left NaN for
+# that ticker. Tickers are processed in chunks of `chunk` to bound memory.
+# Returns a dict: coefficient name ('Alpha' and each factor) -> frame (window end x tickers),
+# indexed by `dates` when given, else by row position.
+def rolling_factor_betas(stock_returns, factor_returns, window, step=1, rf=None, dates=None, chunk=128):
+    tickers = list(stock_returns.columns)
+    names = ['Alpha'] + list(factor_returns.columns)
+    rf = 0 if rf is None else np.asarray(rf, dtype=float).reshape(-1, 1)
+    y = stock_returns.to_numpy(dtype=float) - rf
+    f = factor_returns.to_numpy(dtype=float)
+    ends = np.arange(window, len(f) + 1, step)
+
+    # Cumulative cross products with a leading zero row; a window's sums are two lookups
+    x = _design(np.nan_to_num(f))
+    bad_x = np.concatenate([[0], np.cumsum(np.isnan(f).any(axis=1))])
+    xx = np.concatenate([np.zeros((1, x.shape[1], x.shape[1])), np.cumsum(x[:, :, None] * x[:, None, :], axis=0)])
+    sxx = xx[ends] - xx[ends - window]
+    with np.errstate(invalid='ignore'):
+        inverse = np.linalg.pinv(sxx)
+
+    coef = np.full((len(names), len(ends), len(tickers)), np.nan)
+    for start in range(0, len(tickers), chunk):
+        block = y[:, start:start + chunk]
+        bad = np.concatenate([np.zeros((1, block.shape[1])), np.cumsum(np.isnan(block), axis=0)])
+        xy = np.concatenate([np.zeros((1, x.shape[1], block.shape[1])),
+                             np.cumsum(x[:, :, None] * np.nan_to_num(block)[:, None, :], axis=0)])
+        sxy = xy[ends] - xy[ends - window]
+        solved = np.einsum('wij,wjn->win', inverse, sxy)
+        missing = ((bad[ends] - bad[ends - window]) > 0) | ((bad_x[ends] - bad_x[ends - window]) > 0)[:, None]
+        solved[np.broadcast_to(missing[:, None, :], solved.shape)] = np.nan
+        coef[:, :, start:start + chunk] = solved.transpose(1, 0, 2)
+
+    index = pd.Index(np.asarray(dates)[ends - 1] if dates is not None else ends - 1, name='Date')
+    return {name: pd.DataFrame(coef[i], index=index, columns=tickers) for i, name in enumerate(names)}
+
+def _returns(frame):
+    prices = frame.to_numpy(dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = (prices[1:] / prices[:-1] - 1) * 100
+    return pd.DataFrame(returns, columns=frame.columns)
+
+# Function to load daily stock and factor returns (%) from the local store on the stocks'
+# trading days, with the daily risk-free return (%) to subtract from the stock returns.
+# `factors` is 'market' (S&P 500), 'sectors' (SPDR sector ETFs) or 'fama_french'.
+# Returns (dates, stock returns, factor returns, rf), all row-aligned.
+def load_factor_returns(tickers, factors='sectors', years=5):
+    if factors not in FACTOR_SETS:
+        raise ValueError(f"factors must be one of {FACTOR_SETS}, got {factors!r}")
+    close = price_store.load_close_prices(tickers, years=years)
+    tickers = list(close.columns)
+    if factors == 'fama_french':
+        ff = price_store.load_fama_french(years=years)
+        aligned = alignment.align({'stocks': close, 'factors': ff}, how='pairwise', calendar=close.index)
+        stock_returns = _returns(aligned[tickers])
+        factor_returns = aligned[FAMA_FRENCH].iloc[1:].reset_index(drop=True)
+        dates = aligned['Date'].iloc[1:].reset_index(drop=True)
+        return dates, stock_returns, factor_returns, aligned['RF'].to_numpy()[1:]
+
+    if factors == 'market':
+        levels = price_store.load_market(years=years).to_frame()
+    else:
+        levels = price_store.load_close_prices(SECTOR_ETFS, years=years)
+    aligned = alignment.align({'stocks': close, 'factors': levels}, how='pairwise', calendar=close.index)
+    returns = _returns(aligned[tickers + list(levels.columns)])
+    dates = aligned['Date'].iloc[1:].reset_index(drop=True)
+    rf = capm_functions.daily_risk_free(price_store.load_risk_free(years=years + 1), dates)
+    # plain (not excess) factor returns: subtract rf so the model is in excess returns throughout
+    factor_returns = returns[list(levels.columns)] - rf[:, None]
+    return dates, returns[tickers], factor_returns, rf
+
+# Function to fit a factor model for `tickers` from the local store, over the whole period
+# or (with `window`) on rolling windows every `step` days
+def factor_model(tickers, factors='sectors', years=5, window=None, step=1):
+    dates, stock_returns, factor_returns, rf = load_factor_returns(tickers, factors, years)
+    if window:
+        return rolling_factor_betas(stock_returns, factor_returns, window, step, rf=rf, dates=dates)
+    return factor_betas(stock_returns, factor_returns, rf=rf)
+
+# Factor exposures from the command line:
+#   python -m pages.utils.factor_model AAPL MSFT NVDA --factors fama_french
+#   python -m pages.utils.factor_model --universe --factors sectors --window 252 --step 21
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate multi-factor betas for many tickers.")
+    parser.add_argument('tickers', nargs='*', help="tickers to fit")
+    parser.add_argument('--universe', action='store_true', help="fit the whole cached S&P 500 universe")
+    parser.add_argument('--factors', choices=FACTOR_SETS, default='sectors')
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--window', type=int, help="rolling window in trading days (latest window is printed)")
+    parser.add_argument('--step', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    tickers = price_store.load_universe() if args.universe else args.tickers
+    if not tickers:
+        parser.error("give tickers or --universe")
+    result = factor_model(tickers, args.factors, args.years, args.window, args.step)
+    if args.window:
+        result = pd.DataFrame({name: frame.iloc[-1] for name, frame in result.items()})
+    print(result.round(3).to_string())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+from pages.utils.lazy_import import lazy_import
+
+go = lazy_import('plotly.graph_objects')
+
+# Process-wide cache of serialized Plotly figures, shared by every session. Entries are keyed
+# by the chart function, its arguments and a fingerprint of the data, and the least recently
+# used ones are evicted once the total JSON size exceeds FIGURE_CACHE_MB.
+
+MAX_BYTES = int(float(os.environ.get('FIGURE_CACHE_MB', 64)) * 2**20)
+
+_cache = OrderedDict()
+_size = 0
+_lock = threading.Lock()
+stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+# Function to fingerprint the contents of a frame (values and index)
+def data_version(data):
+    hashes = pd.util.hash_pandas_object(data, index=True).to_numpy()
+    columns = data.columns if isinstance(data, pd.DataFrame) else [data.name]
+    columns = ','.join(map(str, columns))
+    return hashlib.sha1(hashes.tobytes() + columns.encode()).hexdigest()
+
+def _fingerprint(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return data_version(value)
+    return repr(value)
+
+def _key(name, args, kwargs):
+    parts = [name] + [_fingerprint(v) for v in args]
+    parts += [f'{k}={_fingerprint(v)}' for k, v in sorted(kwargs.items())]
+    return '|'.join(parts)
+
+def _get(key):
+    with _lock:
+        spec = _cache.get(key)
+        if spec is None:
+            stats['misses'] += 1
+            return None
+        _cache.move_to_end(key)
+        stats['hits'] += 1
+        return spec
+
+def _put(key, spec):
+    global _size
+    with _lock:
+        if key in _cache or len(spec) > MAX_BYTES:
+            return
+        _cache[key] = spec
+        _size += len(spec)
+        while _size > MAX_BYTES:
+            _, evicted = _cache.popitem(last=False)
+            _size -= len(evicted)
+            stats['evictions'] += 1
+
+# Function to empty the cache
+def clear():
+    global _size
+    with _lock:
+        _cache.clear()
+        _size = 0
+
+# Decorator for chart functions: a repeated call with the same inputs rebuilds the figure
+# from the cached JSON without recreating the traces or re-running Plotly validation.
+# A new Figure is returned on every call, so callers may still modify it.
+def cached_figure(build):
+    @functools.wraps(build)
+    def wrapper(*args, **kwargs):
+        key = _key(build.__name__, args, kwargs)
+        spec = _get(key)
+        if spec is None:
+            fig = build(*args, **kwargs)
+            _put(key, fig.to_json())
+            return fig
+        return go.Figure(json.loads(spec), _validate=False)
+    return wrapper
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pandas as pd
+from pages.utils.forecasting import FIT_BUDGET as _FIT_BUDGET, FIT_MAXITER, forecast_with_fallback
+from pages.utils.model_train import FORECAST_STEPS, forecast_frame
+
+# Background forecast jobs shared by every session of the app. ARIMA fits run in a pool of
+# worker processes; a request for a (ticker, horizon, data) combination that is already queued
+# or running joins the existing job, and finished results stay available to other sessions.
+
+MAX_WORKERS = int(os.environ.get('FORECAST_WORKERS', max(1, (os.cpu_count() or 2) - 1)))
+MAX_RESULTS = 256
+# Seconds a failed job is remembered before a new request for it is fitted again
+FAILED_RESULT_SECONDS = 300
+# Re-estimate ARIMA on the full series only when the evaluation RMSE exceeds this (unset: never)
+REFIT_THRESHOLD = float(os.environ['FORECAST_REFIT_THRESHOLD']) if os.environ.get('FORECAST_REFIT_THRESHOLD') else None
+# Seconds each ARIMA fit may take before the job falls back to a smaller or cheaper model
+FIT_BUDGET = _FIT_BUDGET or 60.0
+# Seconds the prediction page waits between two looks at a pending job
+POLL_SECONDS = 2.0
+
+_pool = None
+_lock = threading.Lock()
+_jobs = {}       # key -> {'future', 'pool', 'submitted', 'started'}
+_results = {}    # key -> {'forecast', 'rmse', 'model', 'metadata', 'duration'} or {'error', 'failed'}
+_durations = []  # seconds taken by finished jobs, used to estimate progress
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+    return _pool
+
+# Function to drop a pool whose worker died (killed, out of memory); the next submit starts a new
+# one. Nothing happens when `pool` has already been replaced, so jobs of an old broken pool
+# collected later do not shut down its healthy successor.
+def _reset_pool(pool):
+    global _pool
+    if pool is not None and pool is _pool:
+        _pool.shutdown(wait=False)
+        _pool = None
+
+def _run(close_price, steps):
+    started = time.time()
+    values, rmse, last_date, metadata = forecast_with_fallback(close_price, steps, FIT_BUDGET, REFIT_THRESHOLD, FIT_MAXITER)
+    return {'forecast': forecast_frame(values, last_date), 'rmse': rmse, 'model': metadata['model'],
+            'metadata': metadata, 'duration': time.time() - started}
+
+# Function to identify a forecast by ticker, horizon and the version of its input data
+def job_key(ticker, close_price, steps=FORECAST_STEPS):
+    last = _as_series(close_price).dropna()
+    return (ticker, steps, str(last.index[-1]), float(last.iloc[-1]), len(last))
+
+def _as_series(close_price):
+    if isinstance(close_price, pd.DataFrame):
+        return close_price.iloc[:, 0]
+    return close_price
+
+def _collect(key):
+    job = _jobs.get(key)
+    if job is None or not job['future'].done():
+        return
+    try:
+        result = job['future'].result()
+        _durations.append(result['duration'])
+        del _durations[:-50]
+    except BrokenProcessPool as e:
+        # every job of the broken pool fails with this; the next request retries at once
+        _reset_pool(job['pool'])
+        result = {'error': f"{type(e).__name__}: {e}", 'failed': 0.0}
+    except Exception as e:
+        result = {'error': f"{type(e).__name__}: {e}", 'failed': time.time()}
+    _results[key] = result
+    del _jobs[key]
+    while len(_results) > MAX_RESULTS:
+        del _results[next(iter(_results))]
+
+# Function to submit a forecast job; returns its key. Nothing is submitted when the same job
+# is already finished, queued or running, or failed less than FAILED_RESULT_SECONDS ago.
+def submit(ticker, close_price, steps=FORECAST_STEPS):
+    key = job_key(ticker, close_price, steps)
+    with _lock:
+        _collect(key)
+        if time.time() - _results.get(key, {}).get('failed', time.time()) > FAILED_RESULT_SECONDS:
+            del _results[key]
+        if key not in _results and key not in _jobs:
+            try:
+                future = _get_pool().submit(_run, _as_series(close_price).dropna(), steps)
+            except BrokenProcessPool:
+                _reset_pool(_pool)
+                future = _get_pool().submit(_run, _as_series(close_price).dropna(), steps)
+            _jobs[key] = {'future': future, 'pool': _pool, 'submitted': time.time()}
+    return key
+
+# Function to get the state of a job: 'done', 'failed', 'running', 'queued' or 'unknown',
+# with the elapsed time and an estimated progress between 0 and 1
+def status(key):
+    with _lock:
+        _collect(key)
+        if key in _results:
+            state = 'failed' if 'error' in _results[key] else 'done'
+            return {'state': state, 'elapsed': 0.0, 'progress': 1.0}
+        job = _jobs.get(key)
+        if job is None:
+            return {'state': 'unknown', 'elapsed': 0.0, 'progress': 0.0}
+        running = job['future'].running()
+        if running and 'started' not in job:
+            job['started'] = time.time()
+        elapsed = time.time() - job.get('started', time.time())
+        typical = sum(_durations) / len(_durations) if _durations else 60.0
+        return {
+            'state': 'running' if running else 'queued',
+            'elapsed': elapsed,
+            'progress': min(elapsed / typical, 0.95) if running else 0.0,
+        }
+
+# Function to get the stored result of a finished job (None while it is still pending)
+def result(key):
+    with _lock:
+        _collect(key)
+        return _results.get(key)
+
+# Function to stop the worker pool: queued jobs are cancelled, running ones are waited for
+def shutdown():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+        _jobs.clear()
@@ -0,0 +1,210 @@
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from pages.utils import baselines, price_store
+from pages.utils.alignment import next_trading_days
+from pages.utils.model_train import (
+    HISTORY_START, get_rolling_mean, get_differencing_order,
+    scaling, evaluate_and_forecast, evaluate_model, inverse_scaling
+)
+
+# Programmatic forecasting API, independent of Streamlit. One ARIMA fit per ticker serves every
+# requested horizon (shorter horizons are prefixes of the longest forecast) and the results of
+# all tickers are returned together in one long-format frame:
+#   Ticker | Horizon | Step | Date | Forecast | RMSE | Model
+
+RESULT_COLUMNS = ['Ticker', 'Horizon', 'Step', 'Date', 'Forecast', 'RMSE', 'Model']
+
+# Wall-clock budget (seconds) of each ARIMA fit in budgeted mode (unset: no limit)
+FIT_BUDGET = float(os.environ['FORECAST_FIT_BUDGET']) if os.environ.get('FORECAST_FIT_BUDGET') else None
+# Optimiser iterations of each ARIMA fit (unset: statsmodels' default)
+FIT_MAXITER = int(os.environ['FORECAST_FIT_MAXITER']) if os.environ.get('FORECAST_FIT_MAXITER') else None
+
+# Models tried in order when a fit runs out of budget or fails: (name, (AR, MA) orders) for
+# ARIMA fits, run in a child process that is killed at the deadline, or (name, forecaster)
+# for the cheap baselines, which run in-process and cannot time out
+FALLBACK_CHAIN = [
+    ('ARIMA(30,d,30)', (30, 30)),
+    ('ARIMA(5,d,5)', (5, 5)),
+    ('Exponential Smoothing', baselines.exponential_smoothing),
+    ('Naive', baselines.naive),
+]
+
+# Child processes are forked where possible: the parent has already imported the heavy libraries
+_CONTEXT = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+
+# Function to run the prediction page's pipeline on one close-price series;
+# returns the forecast values for `steps` trading days, the RMSE and the last observed date.
+# `refit_threshold` (RMSE on standardized prices), `ar`, `ma` and `maxiter` are passed to
+# evaluate_and_forecast.
+def forecast_series(close_price, steps, refit_threshold=None, ar=30, ma=30, maxiter=None):
+    rolling_price = get_rolling_mean(close_price.dropna())
+    differencing_order = get_differencing_order(rolling_price)
+    scaled_data, scaler = scaling(rolling_price)
+    rmse, predictions, _ = evaluate_and_forecast(scaled_data, differencing_order, steps, refit_threshold,
+                                                 ar, ma, maxiter)
+    values = inverse_scaling(scaler, predictions).ravel()
+    return values, rmse, rolling_price.index[-1]
+
+# Function to forecast with a baseline on the same rolling, scaled prices as the ARIMA pipeline
+def baseline_series(close_price, steps, forecaster):
+    rolling_price = get_rolling_mean(close_price.dropna())
+    scaled_data, scaler = scaling(rolling_price)
+    rmse = evaluate_model(scaled_data, 0, forecaster)
+    values = inverse_scaling(scaler, forecaster(scaled_data, 0, steps)).ravel()
+    return values, rmse, rolling_price.index[-1]
+
+def _fit_child(connection, close_price, steps, refit_threshold, ar, ma, maxiter):
+    try:
+        connection.send(('ok', forecast_series(close_price, steps, refit_threshold, ar, ma, maxiter)))
+    except Exception as e:
+        connection.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        connection.close()
+
+# Function to run forecast_series in a child process, killing it after `budget` seconds;
+# returns ('ok', result), ('error', message) or ('timeout', None)
+def _forecast_with_budget(close_price, steps, budget, refit_threshold, ar, ma, maxiter):
+    receiver, sender = _CONTEXT.Pipe(duplex=False)
+    process = _CONTEXT.Process(target=_fit_child, args=(sender, close_price, steps, refit_threshold, ar, ma, maxiter),
+                               daemon=True)
+    process.start()
+    sender.close()
+    try:
+        if receiver.poll(budget):
+            return receiver.recv()
+        return ('timeout', None) if process.is_alive() else ('error', f"fit exited with code {process.exitcode}")
+    except EOFError:
+        return 'error', f"fit exited with code {process.exitcode}"
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        receiver.close()
+
+# Function to forecast one series down FALLBACK_CHAIN: each ARIMA fit gets `budget` seconds
+# (None: no limit, fitted in-process) and `maxiter` optimiser iterations, and the first model
+# that succeeds is used. Returns (values, rmse, last_date, metadata) where metadata records
+# the model used, the budget and every attempt with its outcome and duration.
+def forecast_with_fallback(close_price, steps, budget=FIT_BUDGET, refit_threshold=None, maxiter=FIT_MAXITER):
+    attempts = []
+    for name, model in FALLBACK_CHAIN:
+        started = time.time()
+        if callable(model):
+            outcome, result = 'ok', baseline_series(close_price, steps, model)
+        elif budget is None:
+            try:
+                outcome, result = 'ok', forecast_series(close_price, steps, refit_threshold, *model, maxiter)
+            except Exception as e:
+                outcome, result = 'error', f"{type(e).__name__}: {e}"
+        else:
+            outcome, result = _forecast_with_budget(close_price, steps, budget, refit_threshold, *model, maxiter)
+        attempts.append({'model': name, 'outcome': outcome if outcome != 'error' else result,
+                         'seconds': round(time.time() - started, 3)})
+        if outcome == 'ok':
+            values, rmse, last_date = result
+            return values, rmse, last_date, {'model': name, 'budget': budget, 'maxiter': maxiter, 'attempts': attempts}
+
+def _forecast_job(args):
+    ticker, close_price, steps, refit_threshold, budget, maxiter = args
+    try:
+        values, rmse, last_date, metadata = forecast_with_fallback(close_price, steps, budget, refit_threshold, maxiter)
+        return ticker, values, rmse, last_date, metadata, None
+    except Exception as e:
+        return ticker, None, None, None, None, f"{type(e).__name__}: {e}"
+
+# Function to assemble the long-format result without a per-ticker loop: forecasts and dates
+# are stacked into (ticker x step) arrays, and the rows of every (ticker, horizon) block are
+# gathered from them with one index array. Forecast dates are generated once per distinct last
+# observed date and shared by every ticker that ends on it.
+def _to_long(results, horizons):
+    if not results:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    max_steps = max(horizons)
+    tickers, values, rmse, last_dates, metadata, _ = zip(*results)
+    values = np.stack([v[:max_steps] for v in values])
+    distinct, calendar = np.unique(np.array(last_dates, dtype='datetime64[ns]'), return_inverse=True)
+    dates = np.stack([next_trading_days(d, max_steps).to_numpy(dtype='datetime64[ns]') for d in distinct])
+
+    block_ticker = np.repeat(np.arange(len(tickers)), len(horizons))
+    block_horizon = np.tile(np.asarray(horizons), len(tickers))
+    rows = np.repeat(block_ticker, block_horizon)
+    steps = np.arange(block_horizon.sum()) - np.repeat(np.cumsum(block_horizon) - block_horizon, block_horizon)
+    return pd.DataFrame({
+        'Ticker': np.asarray(tickers, dtype=object)[rows],
+        'Horizon': np.repeat(block_horizon, block_horizon),
+        'Step': steps + 1,
+        'Date': dates[calendar.ravel()[rows], steps],
+        'Forecast': values[rows, steps],
+        'RMSE': np.asarray(rmse, dtype=float)[rows],
+        'Model': np.asarray([m['model'] for m in metadata], dtype=object)[rows],
+    })[RESULT_COLUMNS]
+
+# Function to forecast many tickers over many horizons (in trading days) in one call.
+# `close` is an optional wide close-price frame (Date x ticker); by default prices come from the
+# local price cache. Tickers are fitted in parallel across `max_workers` processes.
+# Each ARIMA fit gets `budget` seconds and `maxiter` optimiser iterations before falling back
+# (see forecast_with_fallback); the fallback metadata of every ticker is in `result.attrs['fits']`.
+# Tickers that fail are listed with their error in `result.attrs['errors']`.
+def forecast_many(tickers, horizons=(30,), close=None, max_workers=None, start=HISTORY_START,
+                  refit_threshold=None, budget=FIT_BUDGET, maxiter=FIT_MAXITER):
+    horizons = sorted(set(int(h) for h in horizons))
+    if close is None:
+        close = price_store.load_close_prices(tickers)
+    close = close.loc[close.index >= pd.Timestamp(start)]
+    jobs = [(t, close[t], max(horizons), refit_threshold, budget, maxiter) for t in tickers if t in close.columns]
+
+    if max_workers == 1 or len(jobs) <= 1:
+        results = [_forecast_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_forecast_job, jobs))
+
+    errors = {t: error for t, _, _, _, _, error in results if error is not None}
+    errors.update({t: 'no price data' for t in tickers if t not in close.columns})
+    result = _to_long([r for r in results if r[5] is None], horizons)
+    result.attrs['errors'] = errors
+    result.attrs['fits'] = {t: metadata for t, _, _, _, metadata, error in results if error is None}
+    return result
+
+# Nightly batch forecasts:
+#   python -m pages.utils.forecasting AAPL MSFT --horizons 5 10 30 --workers 4 --out forecasts.csv
+#   python -m pages.utils.forecasting --universe --out forecasts.parquet
+#   python -m pages.utils.forecasting AAPL --budget 60   (fall back when a fit takes over 60 s)
+#   python -m pages.utils.forecasting AAPL --maxiter 25  (cap the optimiser's iterations)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast closing prices for many tickers.")
+    parser.add_argument('tickers', nargs='*', help="tickers to forecast")
+    parser.add_argument('--universe', action='store_true', help="forecast the whole cached S&P 500 universe")
+    parser.add_argument('--horizons', nargs='+', type=int, default=[30], help="horizons in trading days")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="parallel worker processes")
+    parser.add_argument('--refit-threshold', type=float, help="re-estimate ARIMA when the evaluation RMSE exceeds this")
+    parser.add_argument('--budget', type=float, default=FIT_BUDGET, help="seconds per ARIMA fit before falling back")
+    parser.add_argument('--maxiter', type=int, default=FIT_MAXITER, help="optimiser iterations per ARIMA fit")
+    parser.add_argument('--out', help="output file (.csv or .parquet); prints to stdout if omitted")
+    args = parser.parse_args(argv)
+
+    tickers = price_store.load_universe() if args.universe else args.tickers
+    if not tickers:
+        parser.error("give tickers or --universe")
+    result = forecast_many(tickers, args.horizons, max_workers=args.workers, refit_threshold=args.refit_threshold,
+                           budget=args.budget, maxiter=args.maxiter)
+
+    if args.out and args.out.endswith('.parquet'):
+        result.to_parquet(args.out)
+    elif args.out:
+        result.to_csv(args.out, index=False)
+    else:
+        print(result.to_string(index=False))
+    for ticker, error in result.attrs['errors'].items():
+        print(f"{ticker}: {error}")
+    for ticker, fit in result.attrs['fits'].items():
+        if fit['model'] != FALLBACK_CHAIN[0][0]:
+            print(f"{ticker}: fell back to {fit['model']} ({fit['attempts']})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+# Data-layout policy for price frames kept in a session:
+#   - prices (Open/High/Low/Close/Adj Close) are float32: ~7 significant digits is far more
+#     than a quoted price carries, and half the memory of float64
+#   - volumes are downcast to the smallest integer type that holds them exactly
+#   - repeated labels (tickers, sectors) are categorical
+#   - statistics (returns, betas, regressions) are still accumulated in float64 by the
+#     functions that compute them, so only storage is compact
+#   - derived columns (indicators) are returned as separate arrays instead of being added
+#     to the caller's frame
+
+PRICE_DTYPE = np.float32
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Adj Close', 'Dividends', 'Stock Splits')
+
+# Function to convert an OHLCV frame to the compact layout
+def compact_ohlcv(df):
+    columns = {}
+    for column in df.columns:
+        name = column[0] if isinstance(column, tuple) else column
+        values = df[column]
+        if name in PRICE_COLUMNS:
+            columns[column] = values.astype(PRICE_DTYPE)
+        elif name == 'Volume':
+            columns[column] = pd.to_numeric(values.fillna(0), downcast='unsigned')
+        elif values.dtype == object:
+            columns[column] = values.astype('category')
+        else:
+            columns[column] = values
+    return pd.DataFrame(columns, index=df.index)
+
+# Function to convert every numeric column except 'Date' of a wide price frame to PRICE_DTYPE
+def compact_prices(df):
+    numeric = [c for c in df.columns if c != 'Date' and df[c].dtype.kind == 'f']
+    return df.astype({c: PRICE_DTYPE for c in numeric})
+
+# Function to get the memory used by a frame in bytes
+def memory_footprint(df):
+    return int(df.memory_usage(deep=True).sum())
+
+def _session_frames(wide):
+    from pages.utils import capm_functions
+    return wide, capm_functions.normalize(wide), capm_functions.daily_return(wide)
+
+# Function to measure a multi-ticker session (prices, normalized prices, daily returns) in the
+# float64 layout and in the compact layout; returns bytes held and peak bytes allocated
+def session_footprint(tickers=8, years=10):
+    rows = 252 * years
+    dates = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=rows)
+    rng = np.random.default_rng(0)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (rows, tickers + 1)), axis=0))
+    wide = pd.DataFrame(prices, columns=[f'T{i}' for i in range(tickers)] + ['sp500'])
+    wide.insert(0, 'Date', dates)
+
+    report = {}
+    for layout, convert in (('float64', lambda df: df.copy()), ('compact', compact_prices)):
+        tracemalloc.start()
+        frames = _session_frames(convert(wide))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        report[layout] = {'held': sum(memory_footprint(df) for df in frames), 'peak': peak}
+    return report
+
+# Memory report: python -m pages.utils.frame_layout [tickers] [years]
+if __name__ == '__main__':
+    import sys
+    tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    report = session_footprint(tickers, years)
+    for layout, usage in report.items():
+        print(f"{layout:<8} held {usage['held'] / 2**20:8.2f} MB   peak {usage['peak'] / 2**20:8.2f} MB")
+    saved = 1 - report['compact']['held'] / report['float64']['held']
+    print(f"{tickers} tickers x {years} years: compact layout holds {saved:.0%} less")
@@ -0,0 +1,22 @@
+import numpy as np
+
+# Indicators computed column-wise so that one call covers a whole universe of tickers.
+# They accept a Series or a wide DataFrame (Date x ticker) and follow the pandas_ta defaults.
+
+# Function to calculate the Relative Strength Index (Wilder smoothing)
+def rsi(close, length=14):
+    change = close.diff()
+    gain = change.clip(lower=0).ewm(alpha=1.0 / length, min_periods=length).mean()
+    loss = (-change.clip(upper=0)).ewm(alpha=1.0 / length, min_periods=length).mean()
+    return 100 * gain / (gain + loss)
+
+# Function to calculate the MACD line, signal line and histogram
+def macd(close, fast=12, slow=26, signal=9):
+    macd_line = close.ewm(span=fast, adjust=False).mean() - close.ewm(span=slow, adjust=False).mean()
+    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+    return macd_line, signal_line, macd_line - signal_line
+
+# Function to label the latest MACD state of every column
+def macd_state(close, fast=12, slow=26, signal=9):
+    hist = np.asarray(macd(close, fast, slow, signal)[2].iloc[-1], dtype=float)
+    return np.where(np.isnan(hist), 'N/A', np.where(hist > 0, 'Bullish', 'Bearish'))
@@ -0,0 +1,109 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from pages.utils import capm_functions, price_store
+from pages.utils.data_providers import get_provider
+from pages.utils.frame_layout import compact_ohlcv
+
+# Intraday bars are ingested at a base interval (1m or 5m) into the local cache together with a
+# resampling pyramid 5m -> 1h -> 1d -> 1w, each level built from the one below it. Charts,
+# indicators and high-frequency beta read the level they need directly, and new bars only
+# rebuild the buckets they touch.
+
+# Base intervals and how many days of history Yahoo serves for them
+BASE_INTERVALS = {'1m': 7, '5m': 59}
+
+# level -> (resample rule, bucket offset, closed/label side, longest bucket span)
+LEVELS = {
+    '1m': ('1min', None, 'left', pd.Timedelta(minutes=1)),
+    '5m': ('5min', None, 'left', pd.Timedelta(minutes=5)),
+    '1h': ('1h', '30min', 'left', pd.Timedelta(hours=1)),    # hourly buckets start at the 9:30 open
+    '1d': ('1D', None, 'left', pd.Timedelta(days=1)),
+    '1w': ('W-FRI', None, 'right', pd.Timedelta(days=7)),    # weeks end on Friday
+}
+PYRAMID = ['5m', '1h', '1d', '1w']
+
+# Chart periods served from intraday bars, and the level used for each
+INTRADAY_PERIODS = {'5d': '5m', '1mo': '1h'}
+
+# Seconds after which the stored bars are refreshed
+REFRESH_SECONDS = 300
+
+AGGREGATION = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+def _file(ticker, level):
+    return f'intraday_{ticker}_{level}.parquet'
+
+def _resample(bars, level):
+    rule, offset, side, _ = LEVELS[level]
+    return bars.resample(rule, offset=offset, closed=side, label=side)
+
+# Function to resample OHLCV bars to a pyramid level
+def resample_bars(bars, level):
+    return _resample(bars, level).agg(AGGREGATION).dropna(subset=['Open'])
+
+# Function to get the label of the `level` bucket that contains `timestamp`
+def _bucket(timestamp, level):
+    return _resample(pd.Series([0], index=[timestamp]), level).sum().index[0]
+
+# Function to bring one level up to date: buckets before the one containing `since` are kept as
+# stored, later ones are recomputed from the level below
+def _update_level(stored, lower, level, since):
+    if stored is None or since is None:
+        return resample_bars(lower, level), None
+    start = _bucket(since, level)
+    tail = resample_bars(lower[lower.index >= since - LEVELS[level][3]], level)
+    return pd.concat([stored[stored.index < start], tail[tail.index >= start]]), start
+
+# Function to download the latest intraday bars of `ticker` at the base `interval`, merge them
+# into the cache and update every pyramid level above the base; once bars are stored, only the
+# days from the last stored bar on are downloaded
+def ingest_intraday(ticker, interval='5m'):
+    stored = price_store.read_cache(_file(ticker, interval))
+    start = pd.Timestamp.today().normalize() - pd.Timedelta(days=BASE_INTERVALS[interval])
+    if stored is not None and len(stored) and stored.index[-1] > start:
+        start = stored.index[-1].normalize()
+    data = get_provider().get_ohlcv(ticker, start=start, interval=interval)
+    if len(data) == 0:
+        return
+    new = compact_ohlcv(data[list(AGGREGATION)])
+
+    since = None
+    if stored is not None and len(stored):
+        # the last stored bar may still have been forming, so it is taken again from the download
+        new = new[new.index >= stored.index[-1]]
+        if len(new) == 0:
+            return
+        since = new.index[0]
+    lower = new if since is None else pd.concat([stored[stored.index < since], new])
+    price_store.write_cache(lower, _file(ticker, interval))
+
+    for level in PYRAMID[PYRAMID.index(interval) + 1 if interval in PYRAMID else 0:]:
+        bars, since = _update_level(price_store.read_cache(_file(ticker, level)), lower, level, since)
+        bars = compact_ohlcv(bars)
+        price_store.write_cache(bars, _file(ticker, level))
+        lower = bars
+
+# Function to read stored bars of one level, re-ingesting them first when they are stale
+def load_bars(ticker, level, interval='5m'):
+    path = price_store.cache_path(_file(ticker, interval))
+    if not os.path.exists(path) or time.time() - os.path.getmtime(path) > REFRESH_SECONDS:
+        ingest_intraday(ticker, interval)
+    bars = price_store.read_cache(_file(ticker, level))
+    if bars is None:
+        raise ValueError(f"No intraday data available for {ticker}")
+    bars.index.name = 'Date'
+    return bars
+
+# Function to estimate beta from intraday returns against a market proxy (an index ETF);
+# overnight returns are left out so each return covers one bar within a trading day
+def hf_beta(ticker, market='SPY', level='5m'):
+    close = pd.concat([load_bars(ticker, level)['Close'].rename(ticker),
+                       load_bars(market, level)['Close'].rename(market)], axis=1, join='inner')
+    prices = close.to_numpy(dtype=np.float64)
+    same_day = close.index.normalize()[1:] == close.index.normalize()[:-1]
+    returns = np.where(same_day[:, None], (prices[1:] / prices[:-1] - 1) * 100, np.nan)
+    returns = pd.DataFrame(returns, columns=close.columns)
+    beta, alpha = capm_functions.calculate_betas(returns, market=market)
+    return beta[ticker], alpha[ticker]
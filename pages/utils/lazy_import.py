@@ -0,0 +1,84 @@
+import importlib
+import subprocess
+import sys
+import threading
+import time
+
+# Heavy third-party libraries are wrapped in a LazyModule so they are only imported the first
+# time one of their attributes is used. Pages that never forecast or draw an indicator chart
+# then start without paying for statsmodels, sklearn, pandas_ta and friends.
+
+HEAVY_MODULES = [
+    'yfinance',
+    'pandas_datareader.data',
+    'statsmodels.tsa.arima.model',
+    'statsmodels.tsa.stattools',
+    'sklearn.metrics',
+    'sklearn.preprocessing',
+    'pandas_ta',
+    'plotly.graph_objects',
+    'plotly.express',
+]
+
+# Seconds spent importing each lazily loaded module in this process
+IMPORT_TIMES = {}
+
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    IMPORT_TIMES[self._name] = time.perf_counter() - started
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<LazyModule {self._name!r} ({state})>"
+
+# Function to get a module that is imported on first attribute access
+def lazy_import(name):
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+_PROBE = (
+    "import importlib, resource, sys, time\n"
+    "started = time.perf_counter()\n"
+    "importlib.import_module(sys.argv[1])\n"
+    "elapsed = time.perf_counter() - started\n"
+    "print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+)
+
+# Function to measure the cold import time (s) and peak resident memory (MB) of each module,
+# every one in a fresh interpreter so that nothing is already cached
+def import_report(modules=None):
+    rows = []
+    for name in modules or HEAVY_MODULES:
+        result = subprocess.run([sys.executable, '-c', _PROBE, name], capture_output=True, text=True)
+        if result.returncode != 0:
+            rows.append((name, None, None))
+            continue
+        elapsed, max_rss = result.stdout.split()
+        rows.append((name, float(elapsed), int(max_rss) / 1024))
+    return rows
+
+# Import-time profiling report:
+#   python -m pages.utils.lazy_import [module ...]
+if __name__ == '__main__':
+    print(f"{'module':<40}{'import (s)':>12}{'peak RSS (MB)':>16}")
+    for name, elapsed, rss in import_report(sys.argv[1:]):
+        if elapsed is None:
+            print(f"{name:<40}{'failed':>12}")
+        else:
+            print(f"{name:<40}{elapsed:>12.3f}{rss:>16.1f}")
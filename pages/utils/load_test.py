@@ -0,0 +1,283 @@
+import argparse
+import datetime
+import glob
+import os
+import random
+import resource
+import runpy
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from pages.utils import price_store
+from pages.utils.data_providers import SyntheticProvider, get_provider, set_provider
+
+# Headless load test for the dashboard. Every simulated session is a thread (as in Streamlit)
+# that runs the real page scripts with runpy against a stand-in `streamlit` module: widgets
+# return values picked at random the way a user would, charts and tables are serialised as the
+# server would send them, and everything else renders nothing. Market data comes from the
+# synthetic provider and is cached in a temporary directory, so the test needs no network and
+# leaves the real cache alone. Latency percentiles, throughput, CPU and memory (including the
+# forecast worker processes) are reported at the end.
+#   python -m pages.utils.load_test --sessions 20 --interactions 10
+
+PAGES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = {
+    'capm_beta': '1_*.py',
+    'capm_return': '2_*.py',
+    'analysis': '3_*.py',
+    'prediction': '4_*.py',
+}
+
+class _Rerun(Exception):
+    pass
+
+class _Stop(Exception):
+    pass
+
+_local = threading.local()
+
+# Session state of the session running on the current thread
+class _SessionState(MutableMapping):
+    def _state(self):
+        return _local.session['state']
+
+    def __getitem__(self, key):
+        return self._state()[key]
+
+    def __setitem__(self, key, value):
+        self._state()[key] = value
+
+    def __delitem__(self, key):
+        del self._state()[key]
+
+    def __iter__(self):
+        return iter(self._state())
+
+    def __len__(self):
+        return len(self._state())
+
+    def __getattr__(self, key):
+        try:
+            return self._state()[key]
+        except KeyError:
+            raise AttributeError(key)
+
+# Columns, containers and placeholders: usable with `with` and as `element.widget(...)`
+class _Element:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(_streamlit, name)
+
+# Function to give a widget the same value on every rerun of one interaction, as Streamlit does
+def _widget(label, key, pick):
+    values = _local.session['widgets']
+    name = key or label
+    if name not in values:
+        values[name] = pick(_local.session['rng'])
+    return values[name]
+
+def _selectbox(label, options, index=0, key=None, **kwargs):
+    return _widget(label, key, lambda rng: rng.choice(list(options)))
+
+def _multiselect(label, options, default=None, key=None, **kwargs):
+    options = list(options)
+    return _widget(label, key, lambda rng: rng.sample(options, rng.randint(1, len(options))))
+
+def _number_input(label, min_value=None, max_value=None, value=None, step=None, key=None, **kwargs):
+    if isinstance(min_value, int) and isinstance(max_value, int):
+        return _widget(label, key, lambda rng: rng.randint(min_value, max_value))
+    return value if value is not None else min_value
+
+def _date_input(label, value=None, min_value=None, max_value=None, key=None, **kwargs):
+    return value if value is not None else datetime.date.today()
+
+def _checkbox(label, value=False, key=None, **kwargs):
+    return value
+
+def _slider(label, min_value=None, max_value=None, value=None, key=None, **kwargs):
+    return value if value is not None else min_value
+
+def _error(body, *args, **kwargs):
+    _local.session['errors'].append(str(body))
+
+def _plotly_chart(figure, *args, **kwargs):
+    figure.to_json()
+
+def _dataframe(data=None, *args, **kwargs):
+    from pages.utils.table_view import wire_bytes
+    if isinstance(data, pd.DataFrame):
+        # like Streamlit, mixed-type columns are sent as strings
+        wire_bytes(data.astype({c: str for c in data.columns if data[c].dtype == object}))
+
+def _rerun():
+    raise _Rerun()
+
+def _stop():
+    raise _Stop()
+
+def _nothing(*args, **kwargs):
+    return _Element()
+
+# Function to build the stand-in `streamlit` module; anything not listed renders nothing
+def _headless_streamlit():
+    module = types.ModuleType('streamlit')
+    module.session_state = _SessionState()
+    module.sidebar = _Element()
+    module.columns = lambda spec, **kwargs: [_Element() for _ in range(spec if isinstance(spec, int) else len(spec))]
+    for name, function in {
+        'selectbox': _selectbox, 'radio': _selectbox, 'multiselect': _multiselect,
+        'number_input': _number_input, 'date_input': _date_input, 'checkbox': _checkbox,
+        'slider': _slider, 'error': _error, 'exception': _error, 'plotly_chart': _plotly_chart,
+        'dataframe': _dataframe, 'table': _dataframe, 'rerun': _rerun, 'experimental_rerun': _rerun,
+        'stop': _stop, 'button': lambda *args, **kwargs: False,
+    }.items():
+        setattr(module, name, function)
+    module.__getattr__ = lambda name: _nothing
+    return module
+
+_streamlit = _headless_streamlit()
+
+# Function to run one page interaction: the page script is run, and run again for as long as
+# it asks for a rerun when `follow_reruns` is set. Returns the first error shown or raised.
+def _visit(path, follow_reruns):
+    _local.session['widgets'] = {}
+    _local.session['errors'] = []
+    while True:
+        try:
+            runpy.run_path(path, run_name='__main__')
+        except _Rerun:
+            if follow_reruns:
+                continue
+        except _Stop:
+            pass
+        break
+    return _local.session['errors'][0] if _local.session['errors'] else None
+
+def _session(session_id, pages, interactions, think, seed, forecast, records):
+    rng = random.Random(seed * 100003 + session_id)
+    _local.session = {'state': {}, 'rng': rng}
+    for _ in range(interactions):
+        page = rng.choice(pages)
+        started = time.perf_counter()
+        try:
+            error = _visit(_page_path(page), forecast == 'arima' and page == 'prediction')
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        records.append((page, time.perf_counter() - started, error))
+        if think:
+            time.sleep(rng.expovariate(1 / think))
+
+# Function to get the script of a page
+def _page_path(page):
+    return glob.glob(os.path.join(PAGES_DIR, PAGES[page]))[0]
+
+def _rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:
+        return float('nan')
+
+def _cpu(who):
+    usage = resource.getrusage(who)
+    return usage.ru_utime + usage.ru_stime
+
+# Function to simulate `sessions` concurrent users doing `interactions` page interactions each;
+# returns a summary dict and a per-page latency table (seconds). The prediction page submits its
+# ARIMA job either way; with forecast='arima' each visit waits for it, with 'baseline' only the
+# baseline render is timed and the remaining jobs are finished after the sessions.
+def run_load_test(sessions=10, interactions=5, pages=tuple(PAGES), think=0.0, latency=0.0, seed=0, forecast='baseline'):
+    from pages.utils import forecast_jobs
+
+    saved = {'streamlit': sys.modules.get('streamlit'), 'provider': get_provider(),
+             'cache': price_store.CACHE_DIR, 'poll': forecast_jobs.POLL_SECONDS}
+    sys.modules['streamlit'] = _streamlit
+    set_provider(SyntheticProvider(latency=latency))
+    price_store.CACHE_DIR = tempfile.mkdtemp(prefix='load_test_')
+    if forecast == 'baseline':
+        forecast_jobs.POLL_SECONDS = 0
+
+    records = []
+    try:
+        rss_before = _rss_mb()
+        cpu_before = _cpu(resource.RUSAGE_SELF)
+        children_before = _cpu(resource.RUSAGE_CHILDREN)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as pool:
+            for session_id in range(sessions):
+                pool.submit(_session, session_id, list(pages), interactions, think, seed, forecast, records)
+        wall = time.perf_counter() - started
+        rss_end = _rss_mb()
+        # worker CPU is only counted once the workers have exited
+        forecast_jobs.shutdown()
+        drain = time.perf_counter() - started - wall
+        cpu = _cpu(resource.RUSAGE_SELF) - cpu_before
+        children = _cpu(resource.RUSAGE_CHILDREN) - children_before
+    finally:
+        shutil.rmtree(price_store.CACHE_DIR, ignore_errors=True)
+        price_store.CACHE_DIR = saved['cache']
+        forecast_jobs.POLL_SECONDS = saved['poll']
+        set_provider(saved['provider'])
+        if saved['streamlit'] is None:
+            del sys.modules['streamlit']
+        else:
+            sys.modules['streamlit'] = saved['streamlit']
+
+    frame = pd.DataFrame(records, columns=['Page', 'Latency', 'Error'])
+    ok = frame[frame['Error'].isna()]
+    per_page = ok.groupby('Page')['Latency'].describe(percentiles=[0.5, 0.9, 0.99])
+    latencies = ok['Latency'].to_numpy()
+    summary = {
+        'sessions': sessions,
+        'interactions': len(frame),
+        'errors': int(frame['Error'].notna().sum()),
+        'wall_s': wall,
+        'drain_s': drain,
+        'throughput_per_s': len(frame) / wall if wall else float('nan'),
+        'p50_s': float(np.percentile(latencies, 50)) if len(latencies) else float('nan'),
+        'p90_s': float(np.percentile(latencies, 90)) if len(latencies) else float('nan'),
+        'p99_s': float(np.percentile(latencies, 99)) if len(latencies) else float('nan'),
+        'cpu_s': cpu,
+        'workers_cpu_s': children,
+        'cpu_cores_used': (cpu + children) / (wall + drain) if wall else float('nan'),
+        'rss_start_mb': rss_before,
+        'rss_end_mb': rss_end,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'workers_peak_rss_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+    summary['first_errors'] = frame['Error'].dropna().unique()[:5].tolist()
+    return summary, per_page
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard sessions.")
+    parser.add_argument('--sessions', type=int, default=10, help="concurrent sessions")
+    parser.add_argument('--interactions', type=int, default=5, help="page interactions per session")
+    parser.add_argument('--pages', nargs='+', choices=list(PAGES), default=list(PAGES), help="pages to visit")
+    parser.add_argument('--think', type=float, default=0.0, help="mean think time between interactions (s)")
+    parser.add_argument('--latency', type=float, default=0.0, help="simulated data-source latency per request (s)")
+    parser.add_argument('--forecast', choices=('baseline', 'arima'), default='baseline',
+                        help="prediction page: time the baseline render only, or wait for the ARIMA job")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    summary, per_page = run_load_test(args.sessions, args.interactions, args.pages, args.think,
+                                      args.latency, args.seed, args.forecast)
+    for name, value in summary.items():
+        print(f"{name:<20}{value:.3f}" if isinstance(value, float) else f"{name:<20}{value}")
+    print()
+    print(per_page.round(4).to_string())
+
+if __name__ == '__main__':
+    main()
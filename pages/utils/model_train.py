@@ -1,19 +1,25 @@
-import yfinance as yf
-import matplotlib.pyplot as plt
-from statsmodels.tsa.stattools import adfuller
-from sklearn.metrics import mean_squared_error, r2_score
-from statsmodels.tsa.arima.model import ARIMA
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-from datetime import datetime, timedelta
-import pandas as pd 
+from datetime import datetime
+import pandas as pd
+from pages.utils.lazy_import import lazy_import
+from pages.utils.alignment import next_trading_days
+from pages.utils.data_providers import get_provider
+
+# Heavy libraries are imported on first use
+stattools = lazy_import('statsmodels.tsa.stattools')
+arima_model = lazy_import('statsmodels.tsa.arima.model')
+metrics = lazy_import('sklearn.metrics')
+preprocessing = lazy_import('sklearn.preprocessing')
+
+HISTORY_START = '2024-01-01'
+FORECAST_STEPS = 30
 
 def get_data(ticker):
-    stock_data = yf.download(ticker, start='2024-01-01')
+    stock_data = get_provider().get_ohlcv(ticker, start=HISTORY_START)
     return stock_data[['Close']]
 
 def stationary_check(close_price):
-    adf_test = adfuller(close_price)
+    adf_test = stattools.adfuller(close_price)
     p_value = round(adf_test[1],3)
     return p_value
 
@@ -34,32 +40,59 @@ def get_differencing_order(close_price):
             break
     return d
 
-def fit_model(data, differencing_order):
-    model = ARIMA(data, order=(30,differencing_order,30))
-    model_fit = model.fit()
+# `ar`/`ma` are the AR and MA orders; `maxiter` caps the optimiser's iterations (default: statsmodels')
+def fit_arima(data, differencing_order, ar=30, ma=30, maxiter=None):
+    model = arima_model.ARIMA(data, order=(ar,differencing_order,ma))
+    return model.fit(method_kwargs={'maxiter': maxiter} if maxiter else None)
+
+def fit_model(data, differencing_order, forecast_steps=FORECAST_STEPS):
+    model_fit = fit_arima(data, differencing_order)
 
-    forecast_steps = 30
     forecast = model_fit.get_forecast(steps=forecast_steps)
 
     predictions = forecast.predicted_mean
     return predictions
     
-def evaluate_model(original_price, differencing_order):
+# `fit` is any function with fit_model's signature (default: ARIMA)
+def evaluate_model(original_price, differencing_order, fit=None):
+    fit = fit or fit_model
     train_data, test_data = original_price[:-30], original_price[-30:]
-    predictions = fit_model(train_data,differencing_order)
-    rmse = np.sqrt(mean_squared_error(test_data, predictions))
-    return round(rmse,2)
+    predictions = fit(train_data,differencing_order)
+    # one RMSE per column when several series are scored at once
+    rmse = np.sqrt(metrics.mean_squared_error(test_data, predictions, multioutput='raw_values'))
+    return round(float(rmse[0]),2) if len(rmse) == 1 else np.round(rmse,2)
+
+# Function to evaluate and forecast with a single ARIMA estimation: the model is fitted on all
+# but the last 30 observations, scored on them, then extended with those 30 observations
+# (Kalman filter only, parameters kept) to forecast past the end of the series.
+# When `refit_threshold` is given and the RMSE exceeds it, the parameters are re-estimated on
+# the full series instead, starting from the training estimates (also capped at `maxiter`).
+# `ar`, `ma` and `maxiter` are passed to fit_arima. Returns (rmse, predictions, refitted).
+def evaluate_and_forecast(original_price, differencing_order, forecast_steps=FORECAST_STEPS, refit_threshold=None,
+                          ar=30, ma=30, maxiter=None):
+    train_data, test_data = original_price[:-30], original_price[-30:]
+    model_fit = fit_arima(train_data, differencing_order, ar, ma, maxiter)
+    predictions = model_fit.get_forecast(steps=len(test_data)).predicted_mean
+    rmse = round(np.sqrt(metrics.mean_squared_error(test_data, predictions)), 2)
+
+    refit = refit_threshold is not None and rmse > refit_threshold
+    fit_kwargs = {'method_kwargs': {'maxiter': maxiter}} if refit and maxiter else None
+    model_fit = model_fit.append(test_data, refit=refit, fit_kwargs=fit_kwargs)
+    forecast = model_fit.get_forecast(steps=forecast_steps).predicted_mean
+    return rmse, forecast, refit
 
 def scaling(close_price):
-    scaler = StandardScaler()
+    scaler = preprocessing.StandardScaler()
     scaled_data = scaler.fit_transform(np.array(close_price).reshape(-1,1))
     return scaled_data, scaler
 
-def get_forecast(original_price, differencing_order):
-    predictions = fit_model(original_price, differencing_order)
-    start_date = datetime.now().strftime('%Y-%m-%d')
-    end_date = (datetime.now() + timedelta(days = 29)).strftime('%Y-%m-%d')
-    forecast_index = pd.date_range(start=start_date, end=end_date, freq='D')
+# Forecast dates are the trading days following `last_date` (default: today)
+def get_forecast(original_price, differencing_order, forecast_steps=FORECAST_STEPS, last_date=None):
+    predictions = fit_model(original_price, differencing_order, forecast_steps)
+    return forecast_frame(predictions, last_date)
+
+def forecast_frame(predictions, last_date=None):
+    forecast_index = next_trading_days(last_date or datetime.now(), len(predictions))
     forecast_df = pd.DataFrame(predictions, index = forecast_index, columns = ['Close'])
     return forecast_df
 
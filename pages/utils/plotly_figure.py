@@ -1,20 +1,33 @@
-import plotly.graph_objects as go
 import dateutil
-import pandas_ta as pta
 import datetime
+from pages.utils.lazy_import import lazy_import
+from pages.utils.figure_cache import cached_figure
 
-def plotly_table(dataframe):
+# Heavy libraries are imported on first use
+go = lazy_import('plotly.graph_objects')
+pta = lazy_import('pandas_ta')
+
+@cached_figure
+def plotly_table(dataframe, decimals=3):
     headerColor = 'grey'
     rowEvenColor = '#f8fafd'
     rowOddColor = '#e1efff'
+    # Cells carry plain numbers (rounded, which keeps their JSON short) that the browser formats
+    # with a d3 format; only the header labels are styled, so there is no per-cell markup
+    index = dataframe.index.strftime('%Y-%m-%d') if hasattr(dataframe.index, 'strftime') else dataframe.index
+    numeric = [dataframe[i].dtype.kind == 'f' for i in dataframe.columns]
+    formats = [None] + [f'.{decimals}f' if n else None for n in numeric]
+    columns = [dataframe[i].round(decimals).to_numpy() if n else dataframe[i].to_numpy()
+               for i, n in zip(dataframe.columns, numeric)]
     fig = go.Figure(data=[go.Table(
     header=dict(
-        values=["<b><b>"]+["<b>"+str(i)[:10]+"<b>" for i in dataframe.columns],
+        values=[""]+["<b>"+str(i)[:10]+"</b>" for i in dataframe.columns],
         line_color='#0078ff', fill_color='#0078ff',
         align='center', font=dict(color='white', size=15),height =35,
     ),
     cells=dict(
-        values=[["<b>"+str(i)+"<b>" for i in dataframe.index]]+[dataframe[i] for i in dataframe.columns], fill_color = [[rowOddColor,rowEvenColor,rowOddColor, rowEvenColor]*10],
+        values=[index]+columns, format=formats,
+        fill_color = [[rowOddColor,rowEvenColor,rowOddColor, rowEvenColor]*10],
         align='left', line_color=['white'],font=dict(color=["black"], size=15)
     ))
     ])
@@ -36,10 +49,13 @@ def filter_data(dataframe, num_period):
         date = datetime.datetime(dataframe.index[-1].year, 1,1).strftime('%Y-%m-%d')
     else:
         date = dataframe.index[0]
-    
-    return dataframe.reset_index()[dataframe.reset_index()['Date']>date]
+
+    # Rows keep their position in `dataframe` as index, so indicator arrays can be sliced with it
+    dataframe = dataframe.reset_index()
+    return dataframe[dataframe['Date']>date]
 
 
+@cached_figure
 def close_chart(dataframe, num_period =False):
     if num_period:
         dataframe = filter_data(dataframe,num_period)
@@ -61,6 +77,7 @@ def close_chart(dataframe, num_period =False):
     ))
     return fig
 
+@cached_figure
 def candlestick(dataframe, num_period):
     dataframe = filter_data(dataframe,num_period)
     fig = go.Figure()
@@ -72,13 +89,15 @@ def candlestick(dataframe, num_period):
     return fig
 
     
+@cached_figure
 def RSI(dataframe, num_period):
-    dataframe['RSI'] = pta.rsi(dataframe['Close'])
+    rsi = pta.rsi(dataframe['Close']).to_numpy()
     dataframe = filter_data(dataframe,num_period)
+    rsi = rsi[dataframe.index]
     fig = go.Figure()
     fig.add_trace(go.Scatter(
         x=dataframe['Date'],
-        y=dataframe.RSI, name = 'RSI',marker_color='orange',line = dict( width=2,color = 'orange'),
+        y=rsi, name = 'RSI',marker_color='orange',line = dict( width=2,color = 'orange'),
     ))
     fig.add_trace(go.Scatter(
 
@@ -101,10 +120,12 @@ def RSI(dataframe, num_period):
     )
     return fig
 
+@cached_figure
 def Moving_average(dataframe,num_period):
     
-    dataframe['SMA_50'] = pta.sma(dataframe['Close'],50) 
+    sma_50 = pta.sma(dataframe['Close'],50).to_numpy()
     dataframe = filter_data(dataframe,num_period)
+    sma_50 = sma_50[dataframe.index]
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['Open'],
@@ -117,7 +138,7 @@ def Moving_average(dataframe,num_period):
                         mode='lines', name='High',line = dict( width=2,color = '#0078ff')))
     fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['Low'],
                         mode='lines', name='Low',line = dict( width=2,color = 'red')))
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['SMA_50'],
+    fig.add_trace(go.Scatter(x=dataframe['Date'], y=sma_50,
                         mode='lines', name='SMA 50',line = dict( width=2,color = 'purple')))
     
     fig.update_xaxes(rangeslider_visible=True)
@@ -129,16 +150,18 @@ def Moving_average(dataframe,num_period):
     return fig
 
 
+@cached_figure
 def Moving_average_candle_stick(dataframe,num_period):
 
-    dataframe['SMA_50'] = pta.sma(dataframe['Close'],50) 
+    sma_50 = pta.sma(dataframe['Close'],50).to_numpy()
     dataframe = filter_data(dataframe,num_period)
+    sma_50 = sma_50[dataframe.index]
     fig = go.Figure()
     fig.add_trace(go.Candlestick(x=dataframe.index,
                     open=dataframe['Open'], high=dataframe['High'],
                     low=dataframe['Low'], close=dataframe['Close']))
 
-    fig.add_trace(go.Scatter(x=dataframe['Date'], y=dataframe['SMA_50'],
+    fig.add_trace(go.Scatter(x=dataframe['Date'], y=sma_50,
                         mode='lines', name='SMA 50',line = dict( width=2,color = 'purple')))
     fig.update_xaxes(rangeslider_visible=True)
     fig.update_layout(height = 500,margin=dict(l=0, r=20, t=20, b=0), plot_bgcolor = 'white',paper_bgcolor = '#e1efff',legend=dict(
@@ -148,23 +171,20 @@ def Moving_average_candle_stick(dataframe,num_period):
     
     return fig
 
+@cached_figure
 def MACD(dataframe, num_period):
-    macd = pta.macd(dataframe['Close']).iloc[:,0]
-    macd_signal = pta.macd(dataframe['Close']).iloc[:,1]
-    macd_hist = pta.macd(dataframe['Close']).iloc[:,2]
-    dataframe['MACD'] = macd
-    dataframe['MACD Signal'] = macd_signal
-    dataframe['MACD Hist'] = macd_hist
+    macd_df = pta.macd(dataframe['Close']).to_numpy()
     dataframe = filter_data(dataframe,num_period)
+    macd, macd_signal, macd_hist = macd_df[dataframe.index].T
     fig = go.Figure()
     fig.add_trace(go.Scatter(
         x=dataframe['Date'],
-        y=dataframe['MACD'], name = 'RSI',marker_color='orange',line = dict( width=2,color = 'orange'),
+        y=macd, name = 'RSI',marker_color='orange',line = dict( width=2,color = 'orange'),
     ))
     fig.add_trace(go.Scatter(
 
         x=dataframe['Date'],
-        y=dataframe['MACD Signal'], name = 'Overbought', marker_color='red',line = dict( width=2,color = 'red',dash='dash'),
+        y=macd_signal, name = 'Overbought', marker_color='red',line = dict( width=2,color = 'red',dash='dash'),
     ))
     c = ['red' if cl <0 else "green" for cl in macd_hist]
     
@@ -178,6 +198,7 @@ def MACD(dataframe, num_period):
     )
     return fig
 
+@cached_figure
 def Moving_average_forecast(forecast):
     fig = go.Figure()
     
@@ -0,0 +1,153 @@
+import os
+import time
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from pages.utils.alignment import previous_trading_day
+from pages.utils.data_providers import get_provider
+
+# Local on-disk cache shared by every session of the app
+CACHE_DIR = os.environ.get(
+    'TRADING_APP_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '.data_cache')
+)
+
+POPULAR_TICKERS = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA', 'NFLX', 'BABA', 'JPM', 'MGM']
+
+def cache_path(name):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, name)
+
+def read_cache(name):
+    path = cache_path(name)
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    return None
+
+def write_cache(df, name):
+    df.to_parquet(cache_path(name))
+
+def _clean_index(df):
+    df.index = pd.DatetimeIndex(df.index).tz_localize(None).normalize()
+    df.index.name = 'Date'
+    return df[~df.index.duplicated(keep='last')].sort_index()
+
+# Function to download one field for many tickers in a single batched request
+def _download(tickers, start, field='Close'):
+    data = get_provider().get_prices(list(tickers), start=start, field=field)
+    if len(data) == 0:
+        return pd.DataFrame()
+    return _clean_index(data.dropna(how='all', axis=1))
+
+# Function to check whether a cached frame ends before the last completed NYSE session
+def _is_stale(df):
+    return df.index[-1] < previous_trading_day()
+
+# Seconds before cached prices that are behind the last session are checked again
+# (a provider that has not published the last session yet must not be asked on every rerun)
+PRICE_REFRESH_SECONDS = 15 * 60
+
+def _refresh_due(name, max_age):
+    return time.time() - os.path.getmtime(cache_path(name)) > max_age
+
+# Function to load a wide frame of daily close prices (Date x ticker) from the cache,
+# downloading only the tickers and days that are missing
+def load_close_prices(tickers, years=10):
+    tickers = list(dict.fromkeys(tickers))
+    start = pd.Timestamp(datetime.date.today()) - pd.DateOffset(years=years)
+    close = read_cache('close.parquet')
+
+    if close is not None and len(close) and _is_stale(close) and _refresh_due('close.parquet', PRICE_REFRESH_SECONDS):
+        new = _download(list(close.columns), close.index[-1])
+        close = _clean_index(pd.concat([close, new])) if len(new) else close
+        write_cache(close, 'close.parquet')
+
+    missing = tickers if close is None else [t for t in tickers if t not in close.columns]
+    if missing:
+        new = _download(missing, pd.Timestamp(datetime.date.today()) - pd.DateOffset(years=10))
+        close = new if close is None else close.join(new, how='outer')
+        write_cache(close, 'close.parquet')
+
+    present = [t for t in tickers if t in close.columns]
+    return close.loc[close.index >= start, present]
+
+# FRED series used as the risk-free rate: 3-month Treasury bill, annualised %
+RISK_FREE_SERIES = 'DTB3'
+
+# Seconds before a cached series that is behind the last session is checked again
+# (FRED publishes with a lag, so a stale-looking series must not trigger a request per rerun)
+SERIES_REFRESH_SECONDS = 6 * 3600
+
+# Seconds before the (monthly updated) Fama-French factors are checked again
+FACTOR_REFRESH_SECONDS = 7 * 24 * 3600
+
+# Function to read a cached frame, replacing it with `fetch()` when it is missing, or behind
+# the last session and not refreshed for `max_age` seconds
+def _cached(name, fetch, max_age):
+    df = read_cache(name)
+    if df is None or (_is_stale(df) and _refresh_due(name, max_age)):
+        df = _clean_index(fetch())
+        write_cache(df, name)
+    return df
+
+# Function to load a FRED series from the cache, downloading ten years of it when it is
+# missing or out of date
+def load_series(name, years=10):
+    start = pd.Timestamp(datetime.date.today()) - pd.DateOffset(years=years)
+    fetch = lambda: get_provider().get_series([name], datetime.date.today() - datetime.timedelta(days=3660))
+    series = _cached(f'{name}.parquet', fetch, SERIES_REFRESH_SECONDS)
+    return series.loc[series.index >= start, name]
+
+# Function to load the S&P 500 index level (FRED series, cached)
+def load_market(years=10):
+    return load_series('sp500', years)
+
+# Function to load the annualised risk-free rate in % (FRED series, cached)
+def load_risk_free(years=10):
+    return load_series(RISK_FREE_SERIES, years)
+
+# Function to load the daily Fama-French factors in % (Mkt-RF, SMB, HML, RF; cached)
+def load_fama_french(years=10):
+    start = pd.Timestamp(datetime.date.today()) - pd.DateOffset(years=years)
+    fetch = lambda: get_provider().get_fama_french(datetime.date.today() - datetime.timedelta(days=3660))
+    factors = _cached('fama_french.parquet', fetch, FACTOR_REFRESH_SECONDS)
+    return factors.loc[factors.index >= start]
+
+# Function to get the list of S&P 500 constituents used as the default screening universe
+def load_universe():
+    universe = read_cache('universe.parquet')
+    if universe is None:
+        try:
+            table = pd.read_html('https://en.wikipedia.org/wiki/List_of_S%26P_500_companies')[0]
+            universe = pd.DataFrame({'Ticker': table['Symbol'].str.replace('.', '-', regex=False)})
+        except Exception:
+            universe = pd.DataFrame({'Ticker': POPULAR_TICKERS})
+        write_cache(universe, 'universe.parquet')
+    return list(universe['Ticker'])
+
+FUNDAMENTAL_FIELDS = ['sector', 'marketCap', 'trailingPE', 'trailingEps', 'returnOnEquity',
+                      'profitMargins', 'debtToEquity', 'beta']
+
+def _fetch_info(ticker):
+    try:
+        info = get_provider().get_info(ticker)
+    except Exception:
+        info = {}
+    return {'Ticker': ticker, **{f: info.get(f) for f in FUNDAMENTAL_FIELDS}}
+
+# Function to load cached fundamentals from the provider's company info; missing tickers are fetched
+# in parallel only when `fetch` is set because every lookup is a separate request
+def load_fundamentals(tickers, fetch=False, max_workers=16):
+    fundamentals = read_cache('fundamentals.parquet')
+    if fundamentals is None:
+        fundamentals = pd.DataFrame(columns=['Ticker'] + FUNDAMENTAL_FIELDS)
+    missing = [t for t in tickers if t not in set(fundamentals['Ticker'])]
+    if fetch and missing:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            rows = list(pool.map(_fetch_info, missing))
+        fundamentals = pd.concat([fundamentals, pd.DataFrame(rows)], ignore_index=True)
+        fundamentals['sector'] = fundamentals['sector'].fillna('N/A').astype(str)
+        for f in FUNDAMENTAL_FIELDS[1:]:
+            fundamentals[f] = pd.to_numeric(fundamentals[f], errors='coerce')
+        write_cache(fundamentals, 'fundamentals.parquet')
+    return fundamentals.set_index('Ticker').reindex(tickers)
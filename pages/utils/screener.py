@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from pages.utils import alignment, capm_functions, indicators
+
+# The screener keeps every metric as one NumPy column (a dict of equal-length arrays) so that
+# filters and rankings over thousands of tickers are evaluated as column-wise expressions.
+
+OPERATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '==': np.equal,
+    '!=': np.not_equal,
+}
+
+RETURN_WINDOWS = {'Return 1M (%)': 21, 'Return 3M (%)': 63, 'Return 1Y (%)': 252}
+
+# Function to compute the metrics table from a wide close-price frame (Date x ticker)
+# (`capm` optionally supplies precomputed Beta / Alpha / Expected Return columns per ticker)
+def build_metrics(close, market, fundamentals=None, capm=None):
+    tickers = close.columns
+    aligned = alignment.align_with_market(close, market, how='pairwise')
+    close, market = aligned[tickers], aligned['sp500']
+    filled = close.ffill()
+    last = filled.iloc[-1].to_numpy(dtype=float)
+
+    table = {'Ticker': np.asarray(close.columns, dtype=object), 'Price': last}
+    for name, window in RETURN_WINDOWS.items():
+        base = filled.iloc[-window - 1].to_numpy(dtype=float) if len(filled) > window else np.full(len(last), np.nan)
+        table[name] = (last / base - 1) * 100
+
+    returns = close.pct_change(fill_method=None) * 100
+    table['Volatility (%)'] = returns.std().to_numpy() * np.sqrt(252)
+    if capm is None:
+        returns['sp500'] = market.pct_change(fill_method=None) * 100
+        beta, alpha = capm_functions.calculate_betas(returns)
+        table['Beta'] = beta.to_numpy()
+        table['Alpha'] = alpha.to_numpy()
+    else:
+        for column, values in capm.reindex(tickers).items():
+            table[column] = values.to_numpy(dtype=float)
+
+    table['RSI'] = indicators.rsi(close).iloc[-1].to_numpy(dtype=float)
+    table['MACD'] = indicators.macd_state(close)
+
+    if fundamentals is not None:
+        fundamentals = fundamentals.reindex(tickers)
+        for column in fundamentals.columns:
+            values = fundamentals[column].to_numpy()
+            table[column if column != 'beta' else 'Beta (Yahoo)'] = values
+    return table
+
+# Function to list the numeric columns of a metrics table
+def numeric_columns(table):
+    return [c for c, v in table.items() if v.dtype.kind in 'fiu']
+
+# Function to filter, rank and paginate a metrics table;
+# filters are (column, operator, value) tuples, operator one of OPERATORS, 'between' or 'in'
+def screen(table, filters=(), sort_by=None, ascending=False, page=0, page_size=50):
+    mask = np.ones(len(table['Ticker']), dtype=bool)
+    for column, op, value in filters:
+        values = table[column]
+        if op == 'in':
+            mask &= np.isin(values, list(value))
+        elif op == 'between':
+            mask &= (values >= value[0]) & (values <= value[1])
+        else:
+            mask &= OPERATORS[op](values, value)
+
+    rows = np.flatnonzero(mask)
+    if sort_by is not None:
+        key = table[sort_by][rows]
+        if key.dtype.kind in 'fiu':
+            # NaN always sorts last
+            order = np.argsort(key if ascending else -key, kind='stable')
+        else:
+            order = np.argsort(key.astype(str), kind='stable')
+            order = order if ascending else order[::-1]
+        rows = rows[order]
+
+    window = rows[page * page_size:(page + 1) * page_size]
+    result = pd.DataFrame({column: values[window] for column, values in table.items()})
+    return result, len(rows)
@@ -0,0 +1,68 @@
+import math
+import numpy as np
+import pandas as pd
+import streamlit as st
+from pages.utils.lazy_import import lazy_import
+
+pa = lazy_import('pyarrow')
+
+# Paginated tables for large frames. The server keeps the full frame and only the visible page
+# is handed to st.dataframe, which ships it to the browser as Arrow. The page is made compact
+# first: floats are rounded for display and become float32, and repeated labels become
+# dictionary-encoded categoricals; numbers are still sent as numbers, not per-cell strings.
+
+PAGE_SIZES = (25, 50, 100, 250)
+
+# Function to shrink a frame for the wire: numbers rounded to `decimals` as float32,
+# categorical labels, plain index
+def compact_window(df, decimals=2):
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        if values.dtype.kind == 'f':
+            columns[column] = values.round(decimals).astype(np.float32)
+        elif values.dtype == object and values.nunique() < len(values) / 2:
+            columns[column] = values.astype('category')
+        else:
+            columns[column] = values
+    return pd.DataFrame(columns, index=df.index)
+
+# Function to cut page `page` (0-based) of `page_size` rows out of `df`, optionally sorted;
+# returns the page and the number of pages
+def page_window(df, page=0, page_size=50, sort_by=None, ascending=True):
+    pages = max(1, math.ceil(len(df) / page_size))
+    page = min(max(page, 0), pages - 1)
+    if sort_by is not None:
+        order = np.argsort(df[sort_by].to_numpy(), kind='stable')
+        if not ascending:
+            order = order[::-1]
+        rows = order[page * page_size:(page + 1) * page_size]
+        return df.iloc[rows], pages
+    return df.iloc[page * page_size:(page + 1) * page_size], pages
+
+# Function to get the size in bytes of the Arrow stream st.dataframe would send for `df`
+# (the load test uses it to account for table serialisation)
+def wire_bytes(df):
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+# Function to render the visible page of `df` with its own page controls; `key` keeps the
+# widgets of several tables on one page apart
+def paginated_table(df, key, page_size=50, sort_by=None, ascending=True, decimals=2):
+    col1, col2 = st.columns([1, 1])
+    with col2:
+        page_size = st.selectbox("Rows per Page", PAGE_SIZES, index=PAGE_SIZES.index(page_size)
+                                 if page_size in PAGE_SIZES else 1, key=f"{key}_page_size")
+    pages = max(1, math.ceil(len(df) / page_size))
+    with col1:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, key=f"{key}_page") - 1
+    window, pages = page_window(df, page, page_size, sort_by, ascending)
+    st.caption(f"Rows {page * page_size + 1 if len(df) else 0}–{page * page_size + len(window)} of {len(df)} (page {page + 1} of {pages})")
+    st.dataframe(compact_window(window, decimals), use_container_width=True)
+
+# Function to render a small or already-paged frame (e.g. a screener result) in the compact layout
+def table(df, decimals=2):
+    st.dataframe(compact_window(df, decimals), use_container_width=True)
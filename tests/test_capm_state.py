@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+from pages.utils import alignment, capm_state, price_store
+from pages.utils.data_providers import SyntheticProvider
+
+TICKERS = ['AAPL', 'MSFT', 'NVDA']
+
+def _market_data():
+    provider = SyntheticProvider()
+    end = alignment.previous_trading_day() - 10 * alignment.TRADING_DAY
+    close = price_store._clean_index(provider.get_prices(TICKERS, start=end - pd.DateOffset(years=3)))
+    series = provider.get_series(['sp500', price_store.RISK_FREE_SERIES])
+    series.index = pd.DatetimeIndex(series.index).normalize()
+    close, series = close.loc[:end], series.loc[:end]
+    return close, series['sp500'], series[price_store.RISK_FREE_SERIES]
+
+def _refresh(monkeypatch, close, market, rates, window):
+    monkeypatch.setattr(price_store, 'load_close_prices', lambda tickers, years=10: close[tickers])
+    monkeypatch.setattr(price_store, 'load_market', lambda years=10: market)
+    monkeypatch.setattr(price_store, 'load_risk_free', lambda years=10: rates)
+    return capm_state.refresh_capm_state(TICKERS, window)
+
+def test_incremental_state_matches_full_when_market_lags(monkeypatch, tmp_path):
+    monkeypatch.setattr(price_store, 'CACHE_DIR', str(tmp_path))
+    close, market, rates = _market_data()
+    for window in (None, 100):
+        # first refresh: the market series is a session behind the stocks
+        _refresh(monkeypatch, close.iloc[:-5], market.loc[:close.index[-7]], rates, window)
+        state = _refresh(monkeypatch, close, market, rates, window)
+
+        full = capm_state.init_capm_state(alignment.align_with_market(close, market, how='pairwise'),
+                                          window, rates=rates)
+        assert (state['n'] == full['n']).all()
+        np.testing.assert_allclose(state[capm_state.STATE_COLUMNS].to_numpy(dtype=float),
+                                   full[capm_state.STATE_COLUMNS].to_numpy(dtype=float))
+        assert (state['last_date'] == full['last_date']).all()
@@ -0,0 +1,6 @@
+from pages.utils import frame_layout
+
+def test_compact_session_holds_less_than_float64():
+    # a 10-year multi-ticker session, as on the CAPM pages
+    report = frame_layout.session_footprint(tickers=8, years=10)
+    assert report['compact']['held'] <= 0.8 * report['float64']['held']